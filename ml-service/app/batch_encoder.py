@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import List
+
+
+class BatchEncoder:
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        Micro-batch concurrent encode calls into single SentenceTransformer batches
+
+        Callers block on encode() while a background thread collects queued
+        texts and encodes them together, handing each caller its row. A
+        batch is flushed once max_batch_size texts are collected, or as soon
+        as the queue is empty and no other encode call is still queueing
+        texts, so an idle service never waits. Texts arriving while a batch
+        is encoded share the next one.
+
+        Args:
+            model: SentenceTransformer model used for encoding
+            max_batch_size: Maximum number of texts encoded in one batch
+            max_wait_ms: Longest wait for a call that is still queueing texts
+        """
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        # encode_many() calls that are putting their texts on the queue
+        self._submitting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="batch-encoder", daemon=True)
+        self._thread.start()
+
+    def encode(self, text: str) -> np.ndarray:
+        """Encode a single text, sharing a model batch with concurrent callers"""
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode several texts through the batching queue
+
+        Returns:
+            Array of shape (len(texts), dim), in input order
+        """
+        if self._closed:
+            raise RuntimeError("BatchEncoder is closed")
+
+        futures = []
+        with self._lock:
+            self._submitting += 1
+        try:
+            for text in texts:
+                future = Future()
+                self._queue.put((text, future))
+                futures.append(future)
+        finally:
+            with self._lock:
+                self._submitting -= 1
+        return np.vstack([future.result() for future in futures])
+
+    def close(self):
+        """Stop the batching thread once queued texts have been encoded"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _collect_batch(self, first):
+        """Gather queued texts until the batch is full or no more are coming"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if self._queue.empty() and not self._submitting:
+                break
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the stop signal so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = self._collect_batch(item)
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
@@ -0,0 +1,142 @@
+"""
+Build the binary course catalog used for fast service startup
+
+Course embeddings are taken from the course data when present. Otherwise
+(or with --reencode) they are encoded in large batches, reusing embeddings
+from the existing catalog for courses whose 'Skills Gained' text is unchanged.
+
+Usage:
+    python -m app.build_catalog [--data-path ./data] [--output ./data/catalog]
+        [--reencode] [--full] [--batch-size 256] [--processes 1]
+        [--ivf] [--ivf-lists 0] [--precision int8]
+"""
+import argparse
+import os
+import shutil
+import time
+
+from . import catalog_store
+from .catalog_embeddings import encode_catalog
+from .vector_index import IVFIndex, PRECISIONS, QuantizedIndex
+
+
+class _LazyModel:
+    """Load the SentenceTransformer only if course embeddings have to be generated"""
+
+    def __init__(self):
+        self._model = None
+
+    def _get(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer('all-MiniLM-L6-v2')
+        return self._model
+
+    def encode(self, *args, **kwargs):
+        return self._get().encode(*args, **kwargs)
+
+    def encode_multi_process(self, *args, **kwargs):
+        return self._get().encode_multi_process(*args, **kwargs)
+
+    def start_multi_process_pool(self, *args, **kwargs):
+        return self._get().start_multi_process_pool(*args, **kwargs)
+
+    def stop_multi_process_pool(self, pool):
+        return self._get().stop_multi_process_pool(pool)
+
+
+def build_catalog(
+    data_path: str,
+    output: str = None,
+    reencode: bool = False,
+    full: bool = False,
+    batch_size: int = 256,
+    processes: int = 1,
+    ivf: bool = False,
+    ivf_lists: int = 0,
+    precisions=()
+):
+    """
+    Convert the pickle/CSV course data into the binary catalog format
+
+    Args:
+        data_path: Directory containing the course data files
+        output: Output directory; defaults to the catalog directory in data_path
+        reencode: Encode embeddings even if the course data already has them
+        full: Ignore the existing catalog and encode every course
+        batch_size: Number of texts per model batch
+        processes: Number of CPU encoding processes
+        ivf: Also train and save IVF clusters for the approximate search backend
+        ivf_lists: Number of IVF clusters; 0 picks one from the catalog size
+        precisions: Compact matrix precisions to write for ML_EMBEDDING_PRECISION
+    """
+    output = output or catalog_store.store_path(data_path)
+    model = _LazyModel()
+    encode_options = {
+        "batch_size": batch_size,
+        "processes": processes,
+        "previous": {} if full else catalog_store.read_previous_embeddings(catalog_store.current_version(output)),
+        "checkpoint_dir": os.path.join(output, "build-checkpoint"),
+    }
+    os.makedirs(output, exist_ok=True)
+
+    # With reencode the embeddings are encoded below, so reading the data must not encode them too
+    courses_df = catalog_store.read_course_data(data_path, model=model, encode_missing=not reencode, **encode_options)
+    if reencode:
+        embeddings = encode_catalog(courses_df['Skills Gained'].tolist(), model, **encode_options)
+        courses_df['Embeddings skills'] = list(embeddings)
+
+    # Everything derived from these embeddings goes into the same unpublished
+    # version, so a reload can never pair files from different builds
+    version_dir = catalog_store.new_version(output)
+    try:
+        catalog_store.write_catalog_store(courses_df, version_dir)
+        if ivf or precisions:
+            _, embeddings = catalog_store.read_catalog_store(version_dir)
+        if ivf:
+            index = IVFIndex(embeddings, normalized=True, n_lists=ivf_lists)
+            index.save(version_dir)
+            print(f"Wrote IVF index with {index.n_lists} clusters to {version_dir}")
+        for precision in precisions:
+            QuantizedIndex(embeddings, normalized=True, precision=precision).save(version_dir)
+            print(f"Wrote {precision} embedding matrix to {version_dir}")
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    catalog_store.publish_version(output, version_dir)
+    print(f"Published catalog version {os.path.basename(version_dir)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary course catalog")
+    parser.add_argument("--data-path", default="./data", help="Directory containing the course data files")
+    parser.add_argument("--output", default=None, help="Output directory (default: <data-path>/catalog)")
+    parser.add_argument("--reencode", action="store_true", help="Encode embeddings even if the data has them")
+    parser.add_argument("--full", action="store_true", help="Re-encode every course, ignoring the existing catalog")
+    parser.add_argument("--batch-size", type=int, default=256, help="Texts per encoding batch")
+    parser.add_argument("--processes", type=int, default=1, help="Number of CPU encoding processes")
+    parser.add_argument("--ivf", action="store_true", help="Build IVF clusters for ML_SEARCH_BACKEND=ivf")
+    parser.add_argument("--ivf-lists", type=int, default=0, help="Number of IVF clusters (default: ~4*sqrt(courses))")
+    parser.add_argument(
+        "--precision", nargs="+", choices=PRECISIONS, default=[],
+        help="Also write compact embedding matrices for ML_EMBEDDING_PRECISION"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_catalog(
+        args.data_path,
+        args.output,
+        reencode=args.reencode,
+        full=args.full,
+        batch_size=args.batch_size,
+        processes=args.processes,
+        ivf=args.ivf,
+        ivf_lists=args.ivf_lists,
+        precisions=args.precision
+    )
+    print(f"Catalog built in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
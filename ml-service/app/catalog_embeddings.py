@@ -0,0 +1,127 @@
+import glob
+import hashlib
+import os
+import shutil
+import numpy as np
+from typing import Dict, List, Optional
+
+
+def content_hash(text) -> str:
+    """Stable hash of the text a course embedding is computed from"""
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+# Checkpoint shard files, one per encoded chunk; {} is the shard number
+CHECKPOINT_SHARD = "shard-{:06d}.npz"
+
+
+def _checkpoint_shards(checkpoint_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(checkpoint_dir, "shard-*.npz")))
+
+
+def load_checkpoint(checkpoint_dir: str) -> Dict[str, np.ndarray]:
+    """Load embeddings saved by an interrupted build, keyed by content hash"""
+    if not checkpoint_dir or not os.path.isdir(checkpoint_dir):
+        return {}
+    encoded = {}
+    for shard_path in _checkpoint_shards(checkpoint_dir):
+        with np.load(shard_path) as data:
+            encoded.update(zip(data["hashes"].tolist(), data["embeddings"]))
+    return encoded
+
+
+def _save_checkpoint_shard(checkpoint_dir: str, hashes: List[str], embeddings: np.ndarray):
+    """
+    Atomically save one encoded chunk as a new shard
+
+    Each chunk is written once, so checkpoint I/O stays linear in the
+    catalog size instead of rewriting everything encoded so far.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    number = len(_checkpoint_shards(checkpoint_dir))
+    shard_path = os.path.join(checkpoint_dir, CHECKPOINT_SHARD.format(number))
+    # np.savez appends .npz to names that lack it, so keep the suffix on the temp file
+    tmp_path = os.path.join(checkpoint_dir, f".tmp-{CHECKPOINT_SHARD.format(number)}")
+    np.savez(tmp_path, hashes=np.array(hashes), embeddings=embeddings)
+    os.replace(tmp_path, shard_path)
+
+
+def encode_catalog(
+    texts: List[str],
+    model,
+    batch_size: int = 256,
+    processes: int = 1,
+    previous: Optional[Dict[str, np.ndarray]] = None,
+    checkpoint_dir: Optional[str] = None,
+    checkpoint_every: int = 20
+) -> np.ndarray:
+    """
+    Encode course texts in large batches, reusing embeddings for unchanged text
+
+    Texts are identified by content hash. Only hashes missing from previous
+    (and from the checkpoint of an interrupted build) are encoded, each
+    distinct text once. Every checkpoint_every batches, the newly encoded
+    chunk is saved as a checkpoint shard so a restarted build resumes where
+    it stopped.
+
+    Args:
+        texts: Text to encode for each course ('Skills Gained')
+        model: SentenceTransformer model
+        batch_size: Number of texts per model batch
+        processes: Number of CPU encoding processes; 1 encodes in-process
+        previous: Embeddings from an earlier build, keyed by content hash
+        checkpoint_dir: Directory of checkpoint shards for resumable
+            progress; removed on success
+        checkpoint_every: Number of batches between checkpoints
+
+    Returns:
+        Array of shape (len(texts), dim), in input order
+    """
+    texts = [str(text) for text in texts]
+    hashes = [content_hash(text) for text in texts]
+
+    known = dict(previous or {})
+    encoded = load_checkpoint(checkpoint_dir)
+    if encoded:
+        print(f"Resuming from checkpoint with {len(encoded)} encoded courses")
+    known.update(encoded)
+
+    # Encode each distinct changed text once
+    pending = {}
+    for text, text_hash in zip(texts, hashes):
+        if text_hash not in known:
+            pending.setdefault(text_hash, text)
+    print(f"Encoding {len(pending)} of {len(texts)} courses ({len(texts) - len(pending)} unchanged)")
+
+    if pending:
+        pool = None
+        if processes > 1:
+            pool = model.start_multi_process_pool(target_devices=["cpu"] * processes)
+        try:
+            pending_hashes = list(pending.keys())
+            chunk_size = batch_size * max(1, checkpoint_every)
+            for start in range(0, len(pending_hashes), chunk_size):
+                chunk_hashes = pending_hashes[start:start + chunk_size]
+                chunk_texts = [pending[text_hash] for text_hash in chunk_hashes]
+                if pool is not None:
+                    embeddings = model.encode_multi_process(chunk_texts, pool, batch_size=batch_size)
+                else:
+                    embeddings = model.encode(chunk_texts, batch_size=batch_size, convert_to_numpy=True)
+
+                embeddings = np.asarray(embeddings, dtype=np.float32)
+                for text_hash, embedding in zip(chunk_hashes, embeddings):
+                    encoded[text_hash] = embedding
+                    known[text_hash] = embedding
+                if checkpoint_dir:
+                    _save_checkpoint_shard(checkpoint_dir, chunk_hashes, embeddings)
+                print(f"Encoded {min(start + chunk_size, len(pending_hashes))}/{len(pending_hashes)} courses")
+        finally:
+            if pool is not None:
+                model.stop_multi_process_pool(pool)
+
+    if checkpoint_dir and os.path.isdir(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir)
+
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack([known[text_hash] for text_hash in hashes]).astype(np.float32, copy=False)
@@ -0,0 +1,114 @@
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from . import catalog_store
+
+
+class CatalogReloader:
+    def __init__(self, recommender, watch_interval: float = 0):
+        """
+        Rebuild and swap the recommender's course catalog in the background
+
+        Reloads run on a background thread while the current catalog keeps
+        serving requests. With watch_interval > 0, the catalog source files
+        are polled and a reload starts once a change has settled.
+
+        Args:
+            recommender: CourseRecommender whose catalog is reloaded
+            watch_interval: Seconds between polls of the catalog files; 0 disables watching
+        """
+        self.recommender = recommender
+        self.watch_interval = watch_interval
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._watch_thread = None
+        self._stop = threading.Event()
+
+        self.state = "idle"
+        self.reloads = 0
+        self.last_reload_at = None
+        self.last_error = None
+
+    def trigger(self, reason: str = "manual") -> bool:
+        """
+        Start a background reload unless one is already running
+
+        Returns:
+            True if a reload was started
+        """
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            self.state = "reloading"
+            self._reload_thread = threading.Thread(
+                target=self._reload, args=(reason,), name="catalog-reload", daemon=True
+            )
+            self._reload_thread.start()
+            return True
+
+    def _reload(self, reason: str):
+        print(f"Reloading course catalog ({reason})...")
+        try:
+            self.recommender.reload_catalog()
+        except Exception as e:
+            # Keep serving the current catalog
+            print(f"Catalog reload failed: {e}")
+            self.state = "failed"
+            self.last_error = str(e)
+            return
+        self.state = "idle"
+        self.reloads += 1
+        self.last_error = None
+        self.last_reload_at = datetime.now(timezone.utc).isoformat()
+
+    def _source_signature(self) -> Tuple:
+        """Modification times and sizes of the catalog source files"""
+        signature = []
+        for path in catalog_store.catalog_source_files(self.recommender.data_path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def start_watching(self):
+        """Poll the catalog files and reload when they change"""
+        if self.watch_interval <= 0 or self._watch_thread is not None:
+            return
+        self._watch_thread = threading.Thread(target=self._watch, name="catalog-watch", daemon=True)
+        self._watch_thread.start()
+        print(f"Watching course catalog files every {self.watch_interval}s")
+
+    def _watch(self):
+        loaded = self._source_signature()
+        pending: Optional[Tuple] = None
+        while not self._stop.wait(self.watch_interval):
+            current = self._source_signature()
+            if current == loaded:
+                pending = None
+            elif current != pending:
+                # Files are still changing; wait for them to settle for one interval
+                pending = current
+            elif self.trigger(reason="catalog files changed"):
+                loaded = current
+                pending = None
+
+    def stop(self):
+        self._stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+
+    def status(self) -> Dict:
+        catalog = self.recommender.catalog
+        return {
+            "state": self.state,
+            "catalog_version": catalog.version if catalog is not None else None,
+            "courses": len(catalog) if catalog is not None else 0,
+            "reloads": self.reloads,
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error,
+            "watching": self._watch_thread is not None
+        }
@@ -0,0 +1,268 @@
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .catalog_embeddings import content_hash, encode_catalog
+from .course_catalog import METADATA_COLUMNS
+from .vector_index import (
+    IVF_ASSIGNMENTS_FILE,
+    IVF_CENTROIDS_FILE,
+    PRECISIONS,
+    QUANTIZED_FILE,
+    QUANTIZED_SCALES_FILE,
+)
+
+# Binary catalog layout, written by `python -m app.build_catalog`: each build
+# goes to its own version directory under STORE_DIR, and CURRENT_FILE names
+# the published one
+STORE_DIR = "catalog"
+CURRENT_FILE = "CURRENT"
+VERSION_PREFIX = "v"
+# Published versions kept on disk, so workers still reading the previous one aren't broken
+KEEP_VERSIONS = 2
+# Published versions are readable by the service user, whoever ran the build
+VERSION_DIR_MODE = 0o755
+VERSION_FILE_MODE = 0o644
+EMBEDDINGS_FILE = "course_embeddings.npy"
+METADATA_FILE = "course_metadata.parquet"
+# Hash of the 'Skills Gained' text each stored embedding was computed from
+HASH_COLUMN = "Skills Hash"
+
+PICKLE_FILE = "Coursera_after_embeddings.pkl"
+CSV_FILE = "Coursera_Completed_Data.csv"
+
+
+def store_path(data_path: str) -> str:
+    """Directory holding the binary catalog versions for a data directory"""
+    return os.path.join(data_path, STORE_DIR)
+
+
+def has_catalog_store(store_dir: str) -> bool:
+    """Check whether a complete binary catalog exists in store_dir"""
+    return (
+        os.path.exists(os.path.join(store_dir, EMBEDDINGS_FILE))
+        and os.path.exists(os.path.join(store_dir, METADATA_FILE))
+    )
+
+
+def current_version(store_root: str) -> Optional[str]:
+    """
+    Directory of the published catalog version, or None if there is none
+
+    Catalogs built before versioning keep their files directly in
+    store_root, which is returned as is.
+    """
+    try:
+        with open(os.path.join(store_root, CURRENT_FILE)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return store_root if has_catalog_store(store_root) else None
+    version_dir = os.path.join(store_root, name)
+    return version_dir if has_catalog_store(version_dir) else None
+
+
+def new_version(store_root: str) -> str:
+    """
+    Create an empty, unpublished version directory for a catalog build
+
+    The directory is private (mode 0700) until publish_version() opens it up.
+    """
+    os.makedirs(store_root, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{int(now * 1e6) % 1000000:06d}"
+    return tempfile.mkdtemp(prefix=f"{VERSION_PREFIX}{stamp}-", dir=store_root)
+
+
+def publish_version(store_root: str, version_dir: str):
+    """
+    Make a fully written version directory the current catalog
+
+    The directory and its files are made world-readable first, since the
+    service may run as a different user than the build. CURRENT_FILE is
+    then replaced atomically, so readers load either the old version or
+    the new one, never a mix. Older versions beyond KEEP_VERSIONS are
+    removed.
+    """
+    os.chmod(version_dir, VERSION_DIR_MODE)
+    for entry in os.listdir(version_dir):
+        os.chmod(os.path.join(version_dir, entry), VERSION_FILE_MODE)
+
+    name = os.path.basename(version_dir)
+    pointer = os.path.join(store_root, CURRENT_FILE)
+    tmp_pointer = os.path.join(store_root, f".tmp-{CURRENT_FILE}")
+    with open(tmp_pointer, "w") as f:
+        f.write(name + "\n")
+    os.chmod(tmp_pointer, VERSION_FILE_MODE)
+    os.replace(tmp_pointer, pointer)
+
+    # Files of a pre-versioning catalog are no longer read once CURRENT exists
+    legacy = [EMBEDDINGS_FILE, METADATA_FILE, IVF_CENTROIDS_FILE, IVF_ASSIGNMENTS_FILE, QUANTIZED_SCALES_FILE]
+    legacy += [QUANTIZED_FILE.format(precision) for precision in PRECISIONS]
+    for legacy_name in legacy:
+        path = os.path.join(store_root, legacy_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Version names start with their build time, so they sort by age
+    versions = sorted(
+        entry for entry in os.listdir(store_root)
+        if entry.startswith(VERSION_PREFIX) and entry <= name
+        and os.path.isdir(os.path.join(store_root, entry))
+    )
+    for entry in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(store_root, entry), ignore_errors=True)
+
+
+def published_version(store_root: str) -> Optional[str]:
+    """Directory CURRENT_FILE points at, whether or not it can be read"""
+    try:
+        with open(os.path.join(store_root, CURRENT_FILE)) as f:
+            return os.path.join(store_root, f.read().strip())
+    except OSError:
+        return None
+
+
+def catalog_source_files(data_path: str) -> List[str]:
+    """
+    Files a catalog can be loaded from, in the order they are tried
+
+    Includes every file of the published version (IVF clusters and compact
+    matrices too), so a change to any of them is noticed by the watcher.
+    """
+    store_root = store_path(data_path)
+    files = [os.path.join(store_root, CURRENT_FILE)]
+    version_dir = current_version(store_root)
+    if version_dir is not None:
+        files += [os.path.join(version_dir, name) for name in sorted(os.listdir(version_dir))]
+    return files + [
+        os.path.join(data_path, PICKLE_FILE),
+        os.path.join(data_path, CSV_FILE),
+    ]
+
+
+def read_course_data(data_path: str, model=None, encode_missing: bool = True, **encode_options) -> pd.DataFrame:
+    """
+    Read course data with embeddings from the pickle file, falling back to CSV
+
+    Args:
+        data_path: Directory containing the course data files
+        model: SentenceTransformer used when the CSV has no embeddings
+        encode_missing: Encode embeddings the CSV lacks; when False the
+            data is returned without them, for callers encoding it anyway
+        encode_options: Extra arguments for encode_catalog (batch size,
+            processes, previous embeddings, checkpoint)
+
+    Returns:
+        DataFrame with an 'Embeddings skills' column of NumPy arrays, unless
+        encode_missing is False and the data has none
+    """
+    pkl_path = os.path.join(data_path, PICKLE_FILE)
+    csv_path = os.path.join(data_path, CSV_FILE)
+
+    try:
+        # Try to load pickle file with embeddings first
+        print(f"Loading course data from {pkl_path}...")
+        courses_df = pd.read_pickle(pkl_path)
+        # Ensure embeddings are numpy arrays
+        if 'Embeddings skills' in courses_df.columns:
+            courses_df['Embeddings skills'] = courses_df['Embeddings skills'].apply(np.array)
+        print(f"Loaded {len(courses_df)} courses with embeddings!")
+    except Exception as e:
+        print(f"Could not load pickle file: {e}")
+        print(f"Loading from CSV: {csv_path}...")
+        courses_df = pd.read_csv(csv_path)
+        # Generate embeddings for courses if not present
+        if 'Embeddings skills' not in courses_df.columns:
+            if not encode_missing:
+                print(f"Loaded {len(courses_df)} courses without embeddings")
+                return courses_df
+            if model is None:
+                raise ValueError("Course data has no embeddings and no model was given to encode them")
+            print("Generating embeddings for courses...")
+            embeddings = encode_catalog(courses_df['Skills Gained'].tolist(), model, **encode_options)
+            courses_df['Embeddings skills'] = list(embeddings)
+        else:
+            # Parse string embeddings to numpy arrays
+            print("Parsing embeddings from CSV...")
+            def parse_embedding(emb):
+                if isinstance(emb, str):
+                    return np.fromstring(emb.strip('[]'), sep=' ')
+                elif isinstance(emb, np.ndarray):
+                    return emb
+                else:
+                    return np.array(emb)
+            courses_df['Embeddings skills'] = courses_df['Embeddings skills'].apply(parse_embedding)
+        print(f"Loaded {len(courses_df)} courses!")
+
+    return courses_df
+
+
+def write_catalog_store(courses_df: pd.DataFrame, store_dir: str, embeddings: Optional[np.ndarray] = None):
+    """
+    Write a catalog as an L2-normalized float32 .npy matrix plus Parquet metadata
+
+    store_dir should be a fresh directory from new_version(). Readers only
+    see it once publish_version() points CURRENT at it, after IVF clusters
+    and compact matrices for the same embeddings have been added.
+
+    Args:
+        courses_df: Course metadata, with an 'Embeddings skills' column unless embeddings is given
+        store_dir: Output directory
+        embeddings: Embedding matrix of shape (n_courses, dim)
+    """
+    if embeddings is None:
+        embeddings = np.vstack(courses_df['Embeddings skills'].values)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.shape[0] != len(courses_df):
+        raise ValueError(f"Got {matrix.shape[0]} embeddings for {len(courses_df)} courses")
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = np.ascontiguousarray(matrix / norms)
+
+    columns = [name for name in METADATA_COLUMNS if name in courses_df.columns]
+    metadata = courses_df[columns].reset_index(drop=True)
+    if 'Skills Gained' in metadata.columns:
+        metadata[HASH_COLUMN] = metadata['Skills Gained'].map(content_hash)
+
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, EMBEDDINGS_FILE), matrix)
+    metadata.to_parquet(os.path.join(store_dir, METADATA_FILE), index=False)
+    print(f"Wrote catalog of {len(metadata)} courses x {matrix.shape[1]} dims to {store_dir}")
+
+
+def read_catalog_store(store_dir: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Read a binary catalog, memory-mapping the embedding matrix
+
+    The matrix is opened read-only with mmap_mode='r', so worker processes
+    on the same host share its pages through the OS page cache.
+
+    Returns:
+        Tuple of (metadata DataFrame, normalized float32 embeddings)
+    """
+    metadata = pd.read_parquet(os.path.join(store_dir, METADATA_FILE))
+    embeddings = np.load(os.path.join(store_dir, EMBEDDINGS_FILE), mmap_mode='r')
+    if embeddings.shape[0] != len(metadata):
+        raise ValueError(
+            f"Catalog in {store_dir} has {embeddings.shape[0]} embeddings for {len(metadata)} courses"
+        )
+    return metadata, embeddings
+
+
+def read_previous_embeddings(store_dir: Optional[str]) -> Dict[str, np.ndarray]:
+    """
+    Map content hashes to embeddings from an existing binary catalog
+
+    Used to re-encode only courses whose 'Skills Gained' text changed.
+    """
+    if store_dir is None or not has_catalog_store(store_dir):
+        return {}
+    metadata, embeddings = read_catalog_store(store_dir)
+    if HASH_COLUMN not in metadata.columns:
+        return {}
+    return {text_hash: np.array(embeddings[i]) for i, text_hash in enumerate(metadata[HASH_COLUMN])}
@@ -0,0 +1,83 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/0, true/false, yes/no) from the environment"""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Worker pools used to keep CPU-bound inference off the event loop
+THREAD_WORKERS = _env_int("ML_THREAD_WORKERS", min(8, os.cpu_count() or 1))
+PROCESS_WORKERS = _env_int("ML_PROCESS_WORKERS", 2)
+MAX_QUEUE_DEPTH = _env_int("ML_MAX_QUEUE_DEPTH", 64)
+
+# Micro-batching of query encoding
+ENCODE_MAX_BATCH = _env_int("ML_ENCODE_MAX_BATCH", 32)
+ENCODE_MAX_WAIT_MS = _env_float("ML_ENCODE_MAX_WAIT_MS", 5.0)
+
+# Query embedding and top-k result caches
+EMBEDDING_CACHE_SIZE = _env_int("ML_EMBEDDING_CACHE_SIZE", 4096)
+RESULT_CACHE_SIZE = _env_int("ML_RESULT_CACHE_SIZE", 1024)
+CACHE_TTL_SECONDS = _env_float("ML_CACHE_TTL_SECONDS", 3600.0)
+
+# Batch skill extraction limit
+BATCH_MAX_TEXTS = _env_int("ML_BATCH_MAX_TEXTS", 1000)
+
+# spaCy pipeline profile for skill extraction: full, standard or matcher-only
+SPACY_PROFILE = os.getenv("ML_SPACY_PROFILE", "standard")
+
+# Catalog hot reload: poll interval for catalog files (0 disables) and the
+# token required by the admin endpoints (unset disables them)
+CATALOG_WATCH_INTERVAL = _env_float("ML_CATALOG_WATCH_INTERVAL", 0.0)
+ADMIN_TOKEN = os.getenv("ML_ADMIN_TOKEN", "")
+
+# Course search backend: exact (brute-force scan) or ivf (approximate)
+SEARCH_BACKEND = os.getenv("ML_SEARCH_BACKEND", "exact")
+IVF_LISTS = _env_int("ML_IVF_LISTS", 0)
+IVF_PROBES = _env_int("ML_IVF_PROBES", 16)
+
+# Compact embedding storage for the exact backend: float32 (off) or int8;
+# candidates from the compact scan are re-ranked in float32, keeping
+# top_n * ML_RERANK_FACTOR of them. Only used with the memory-mapped binary
+# catalog; with the pickle/CSV fallback the search stays float32.
+EMBEDDING_PRECISION = os.getenv("ML_EMBEDDING_PRECISION", "float32")
+RERANK_FACTOR = _env_int("ML_RERANK_FACTOR", 4)
+
+# PDF upload limits and parallel page extraction
+PDF_MAX_BYTES = _env_int("ML_PDF_MAX_BYTES", 10 * 1024 * 1024)
+PDF_MAX_PAGES = _env_int("ML_PDF_MAX_PAGES", 50)
+PDF_TIMEOUT_SECONDS = _env_float("ML_PDF_TIMEOUT_SECONDS", 30.0)
+PDF_PAGES_PER_TASK = _env_int("ML_PDF_PAGES_PER_TASK", 4)
+
+# Skill extraction result cache: in-process LRU size and optional SQLite file
+EXTRACTION_CACHE_SIZE = _env_int("ML_EXTRACTION_CACHE_SIZE", 2048)
+EXTRACTION_CACHE_DB = os.getenv("ML_EXTRACTION_CACHE_DB", "")
+# SQLite entries older than this are pruned when a worker opens the file (0 keeps them)
+EXTRACTION_CACHE_MAX_AGE_SECONDS = _env_float("ML_EXTRACTION_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600.0)
+
+# Skill taxonomy JSON/CSV file with canonical IDs and aliases; empty uses
+# the built-in KNOWN_SKILLS list. A compiled copy is cached next to the file.
+SKILL_TAXONOMY = os.getenv("ML_SKILL_TAXONOMY", "")
+
+# Minimum cosine similarity for a semantic skill match in compare_skills
+SEMANTIC_MATCH_THRESHOLD = _env_float("ML_SEMANTIC_MATCH_THRESHOLD", 0.75)
+
+# Prometheus metrics on /metrics, and a log line with the stage breakdown of
+# requests slower than ML_SLOW_REQUEST_MS (0 disables the log)
+METRICS_ENABLED = _env_bool("ML_METRICS_ENABLED", True)
+SLOW_REQUEST_MS = _env_float("ML_SLOW_REQUEST_MS", 0.0)
@@ -0,0 +1,309 @@
+import itertools
+import re
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from .vector_index import build_index
+
+# Metadata columns kept from the course data, with defaults for missing columns
+METADATA_COLUMNS = {
+    'Course Name': '',
+    'Provider': '',
+    'Skills Gained': '',
+    'Rating Score': np.nan,
+    'Level & Duration': 'N/A',
+    'Course Link': '',
+    'Course Image': '',
+    'Provider Image': '',
+}
+
+# Course levels recognized in the 'Level & Duration' column (e.g. "Beginner · Course · 1 - 3 Months")
+COURSE_LEVELS = ("beginner", "intermediate", "advanced", "mixed")
+_DURATION_PATTERN = re.compile(r"\b(hours?|days?|weeks?|months?)\b")
+
+_catalog_versions = itertools.count(1)
+
+_NO_ROWS = np.empty(0, dtype=np.int64)
+_NO_ROWS.setflags(write=False)
+
+
+@dataclass(frozen=True)
+class CourseFilters:
+    """Metadata filters applied before top-k selection; hashable for use in cache keys"""
+    provider: Optional[str] = None
+    min_rating: Optional[float] = None
+    level: Optional[str] = None
+    duration: Optional[str] = None
+
+    @classmethod
+    def create(cls, provider=None, min_rating=None, level=None, duration=None) -> Optional["CourseFilters"]:
+        """Build normalized filters, or None if no filter is set"""
+        filters = cls(
+            provider=_normalize_value(provider),
+            min_rating=float(min_rating) if min_rating is not None else None,
+            level=_normalize_value(level),
+            duration=_normalize_value(duration)
+        )
+        return filters if filters != cls() else None
+
+
+def _normalize_value(value) -> Optional[str]:
+    """Lowercase, whitespace-collapsed value used for exact metadata matching"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    value = " ".join(str(value).lower().split())
+    return value or None
+
+
+def parse_level_duration(value) -> Tuple[Optional[str], Optional[str]]:
+    """Split a 'Level & Duration' value into normalized (level, duration) parts"""
+    level = duration = None
+    for part in re.split(r"[·•|]", str(value) if value is not None else ""):
+        part = _normalize_value(part)
+        if part in COURSE_LEVELS:
+            level = part
+        elif part and _DURATION_PATTERN.search(part):
+            duration = part
+    return level, duration
+
+
+def _posting_lists(values) -> Dict[str, np.ndarray]:
+    """Map each distinct value to the sorted row indices holding it"""
+    postings = {}
+    for idx, value in enumerate(values):
+        if value is not None:
+            postings.setdefault(value, []).append(idx)
+    return MappingProxyType({
+        value: np.array(rows, dtype=np.int64) for value, rows in postings.items()
+    })
+
+
+class CourseCatalog:
+    def __init__(
+        self,
+        courses_df: pd.DataFrame,
+        embeddings: Optional[np.ndarray] = None,
+        normalized: bool = False,
+        backend: str = "exact",
+        index_options: Optional[Dict] = None
+    ):
+        """
+        Build an immutable, columnar snapshot of the course catalog
+
+        Each metadata column is stored as a read-only NumPy array and the
+        embeddings are held in a search index. Nothing is written to the
+        catalog after construction, so it can be shared by concurrent
+        requests without locking.
+
+        Args:
+            courses_df: Course data with an 'Embeddings skills' column unless embeddings is given
+            embeddings: Embedding matrix of shape (n_courses, dim)
+            normalized: The embedding rows are already unit-length float32
+            backend: Search backend name, see vector_index.SEARCH_BACKENDS
+            index_options: Backend-specific index options
+        """
+        self.size = len(courses_df)
+        self.version = next(_catalog_versions)
+
+        columns = {}
+        for name, default in METADATA_COLUMNS.items():
+            if name in courses_df.columns:
+                values = courses_df[name].to_numpy(copy=True)
+            else:
+                values = np.full(self.size, default, dtype=object)
+            values.setflags(write=False)
+            columns[name] = values
+        self.columns = MappingProxyType(columns)
+
+        self._build_filter_indexes()
+
+        if embeddings is None:
+            embeddings = np.vstack(courses_df['Embeddings skills'].values)
+        self.index = build_index(embeddings, backend, normalized=normalized, **(index_options or {}))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _build_filter_indexes(self):
+        """Precompute posting lists for provider, level and duration, and a rating order"""
+        self.provider_postings = _posting_lists(
+            _normalize_value(provider) for provider in self.columns['Provider']
+        )
+        parsed = [parse_level_duration(value) for value in self.columns['Level & Duration']]
+        self.level_postings = _posting_lists(level for level, _ in parsed)
+        self.duration_postings = _posting_lists(duration for _, duration in parsed)
+
+        # Rows sorted by descending rating; unrated courses never pass a min_rating filter
+        ratings = pd.to_numeric(pd.Series(self.columns['Rating Score']), errors='coerce').to_numpy(dtype=np.float64)
+        rated = np.flatnonzero(~np.isnan(ratings))
+        order = rated[np.argsort(-ratings[rated], kind="stable")]
+        self._ratings = ratings
+        self._rating_order = order
+        self._sorted_ratings = -ratings[order]
+        for array in (self._ratings, self._rating_order, self._sorted_ratings):
+            array.setflags(write=False)
+
+    def filter_rows(self, filters: Optional[CourseFilters]) -> Optional[np.ndarray]:
+        """
+        Sorted row indices of courses passing the filters, or None when nothing is filtered
+
+        The posting lists of the filtered values are intersected as sorted
+        index arrays, starting from the shortest, and the rating filter is
+        checked on the surviving rows, so the cost is proportional to the
+        posting lists involved rather than to the catalog size.
+        """
+        if filters is None:
+            return None
+
+        lists = [
+            postings.get(value, _NO_ROWS)
+            for value, postings in (
+                (filters.provider, self.provider_postings),
+                (filters.level, self.level_postings),
+                (filters.duration, self.duration_postings),
+            )
+            if value is not None
+        ]
+        if not lists:
+            if filters.min_rating is None:
+                return None
+            count = np.searchsorted(self._sorted_ratings, -filters.min_rating, side="right")
+            return np.sort(self._rating_order[:count])
+
+        lists.sort(key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            found = np.minimum(np.searchsorted(other, rows), len(other) - 1)
+            rows = rows[other[found] == rows] if len(other) else _NO_ROWS
+        if filters.min_rating is not None:
+            # NaN ratings compare False, so unrated courses are dropped
+            rows = rows[self._ratings[rows] >= filters.min_rating]
+        return rows
+
+    def filter_mask(self, filters: Optional[CourseFilters]) -> Optional[np.ndarray]:
+        """Boolean mask of courses passing the filters, or None when nothing is filtered"""
+        rows = self.filter_rows(filters)
+        if rows is None:
+            return None
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_n: int,
+        filters: Optional[CourseFilters] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return request-local (indices, scores) of the best matching courses that pass the filters"""
+        return self.index.search(query_embedding, top_n, mask=self.filter_mask(filters))
+
+    def search_many(
+        self,
+        query_embeddings: np.ndarray,
+        top_n: int,
+        filters: Optional[CourseFilters] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Search for several queries at once, sharing one filter mask and matrix product"""
+        return self.index.search_many(query_embeddings, top_n, mask=self.filter_mask(filters))
+
+    def coverage_search(
+        self,
+        skill_embeddings: np.ndarray,
+        top_n: int,
+        filters: Optional[CourseFilters] = None
+    ) -> Tuple[np.ndarray, np.ndarray, List[List[int]]]:
+        """
+        Pick courses that together cover as many skills as possible
+
+        All skills are scored against the catalog in one (skills x courses)
+        matrix product. Courses are then chosen greedily: each pick is the
+        course adding the most coverage, i.e. the largest sum over skills of
+        how much it beats the best similarity already selected for that skill.
+
+        Args:
+            skill_embeddings: Matrix of shape (n_skills, dim), one row per skill
+            top_n: Number of courses to pick
+            filters: Only pick courses matching these metadata filters
+
+        Returns:
+            Tuple of (course indices, scores, covered skill rows per course),
+            in pick order. A course's score is its best skill similarity and
+            it covers the skills it is the best selected match for.
+        """
+        queries = np.asarray(skill_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+
+        rows = self.filter_rows(filters)
+        candidates = np.arange(self.size) if rows is None else rows
+        top_n = min(top_n, len(candidates))
+        if top_n <= 0 or len(queries) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), []
+
+        embeddings = self.index.embeddings if rows is None else self.index.embeddings[candidates]
+        # Negative similarity never counts as coverage
+        similarity = np.maximum(queries @ embeddings.T, 0.0)
+
+        best = np.zeros(len(queries), dtype=np.float32)
+        available = np.ones(len(candidates), dtype=bool)
+        picked = []
+        for _ in range(top_n):
+            gains = np.maximum(similarity - best[:, None], 0.0).sum(axis=0)
+            if not gains[available].any():
+                # Nothing adds coverage any more; fill up with the most similar courses
+                gains = similarity.sum(axis=0)
+            gains[~available] = -np.inf
+            column = int(np.argmax(gains))
+            picked.append(column)
+            available[column] = False
+            best = np.maximum(best, similarity[:, column])
+
+        picked = np.array(picked, dtype=np.int64)
+        chosen = similarity[:, picked]
+        owner = chosen.argmax(axis=1)
+        covered = [np.flatnonzero((owner == i) & (chosen[:, i] > 0)).tolist() for i in range(len(picked))]
+        return candidates[picked], chosen.max(axis=0), covered
+
+    def course(self, idx: int, similarity: float, detailed: bool = False) -> Dict:
+        """
+        Format a single course as an API result
+
+        Args:
+            idx: Row index of the course
+            similarity: Similarity score for the course
+            detailed: Include provider image and match percentage
+
+        Returns:
+            Course metadata dictionary
+        """
+        columns = self.columns
+        rating = columns['Rating Score'][idx]
+        result = {
+            'course_name': columns['Course Name'][idx],
+            'provider': columns['Provider'][idx],
+            'skills_gained': columns['Skills Gained'][idx],
+            'rating': float(rating) if pd.notna(rating) else None,
+            'level_duration': columns['Level & Duration'][idx],
+            'course_url': columns['Course Link'][idx],
+            'course_image': columns['Course Image'][idx],
+        }
+        if detailed:
+            result['provider_image'] = columns['Provider Image'][idx]
+        result['similarity_score'] = float(similarity)
+        if detailed:
+            result['match_percentage'] = round(float(similarity) * 100, 2)
+        return result
+
+    def courses(self, indices: np.ndarray, similarities: np.ndarray, detailed: bool = False) -> List[Dict]:
+        """Format search results, preserving their order"""
+        return [
+            self.course(int(idx), similarity, detailed=detailed)
+            for idx, similarity in zip(indices, similarities)
+        ]
@@ -1,16 +1,37 @@
-import pandas as pd
+import threading
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Dict
-import os
+from typing import List, Dict, Optional, Tuple
+
+from . import config, catalog_store
+from .batch_encoder import BatchEncoder
+from .skill_extractor import SkillExtractor
+from .course_catalog import CourseCatalog, CourseFilters
+from .metrics import span
+from .query_cache import LRUCache, normalize_query
+from .vector_index import IVFIndex, QuantizedIndex, is_memory_mapped
+
+# recommend_courses strategies: one combined query, or per-skill coverage
+RECOMMEND_STRATEGIES = ("combined", "coverage")
 
 class CourseRecommender:
-    def __init__(self, data_path: str = "./data"):
-        """Initialize the course recommender with pre-trained model and data"""
+    def __init__(self, data_path: str = "./data", skill_extractor: Optional[SkillExtractor] = None):
+        """
+        Initialize the course recommender with pre-trained model and data
+
+        Args:
+            data_path: Directory containing the course data files
+            skill_extractor: Shared skill extractor; one is created on first use if omitted
+        """
         self.data_path = data_path
+        self.skill_extractor = skill_extractor
         self.model = None
-        self.courses_df = None
+        self.encoder = None
+        self.catalog = None
+        # Query embeddings don't depend on the catalog; results are keyed by catalog version
+        self.embedding_cache = LRUCache(config.EMBEDDING_CACHE_SIZE, config.CACHE_TTL_SECONDS)
+        self.result_cache = LRUCache(config.RESULT_CACHE_SIZE, config.CACHE_TTL_SECONDS)
+        self._reload_lock = threading.Lock()
         self._load_model()
         self._load_courses()
 
@@ -18,48 +39,194 @@ class CourseRecommender:
         """Load the sentence transformer model"""
         print("Loading sentence transformer model...")
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Query encoding goes through a micro-batching queue shared by all requests
+        self.encoder = BatchEncoder(
+            self.model,
+            max_batch_size=config.ENCODE_MAX_BATCH,
+            max_wait_ms=config.ENCODE_MAX_WAIT_MS
+        )
         print("Model loaded successfully!")
 
+    def close(self):
+        """Stop the background encoding thread"""
+        if self.encoder is not None:
+            self.encoder.close()
+
     def _load_courses(self):
-        """Load course data with embeddings"""
-        pkl_path = os.path.join(self.data_path, "Coursera_after_embeddings.pkl")
-        csv_path = os.path.join(self.data_path, "Coursera_Completed_Data.csv")
-
-        try:
-            # Try to load pickle file with embeddings first
-            print(f"Loading course data from {pkl_path}...")
-            self.courses_df = pd.read_pickle(pkl_path)
-            # Ensure embeddings are numpy arrays
-            if 'Embeddings skills' in self.courses_df.columns:
-                self.courses_df['Embeddings skills'] = self.courses_df['Embeddings skills'].apply(np.array)
-            print(f"Loaded {len(self.courses_df)} courses with embeddings!")
-        except Exception as e:
-            print(f"Could not load pickle file: {e}")
-            print(f"Loading from CSV: {csv_path}...")
-            self.courses_df = pd.read_csv(csv_path)
-            # Generate embeddings for courses if not present
-            if 'Embeddings skills' not in self.courses_df.columns:
-                print("Generating embeddings for courses...")
-                self.courses_df['Embeddings skills'] = self.courses_df['Skills Gained'].apply(
-                    lambda x: self.model.encode(str(x))
-                )
-            else:
-                # Parse string embeddings to numpy arrays
-                print("Parsing embeddings from CSV...")
-                def parse_embedding(emb):
-                    if isinstance(emb, str):
-                        return np.fromstring(emb.strip('[]'), sep=' ')
-                    elif isinstance(emb, np.ndarray):
-                        return emb
-                    else:
-                        return np.array(emb)
-                self.courses_df['Embeddings skills'] = self.courses_df['Embeddings skills'].apply(parse_embedding)
-            print(f"Loaded {len(self.courses_df)} courses!")
+        """Load course data with embeddings into an immutable catalog"""
+        self._set_catalog(self._build_catalog())
+        print(f"Built course catalog: {len(self.catalog)} courses x {self.catalog.index.dim} dims")
+
+    def _build_catalog(self) -> CourseCatalog:
+        """Build a catalog snapshot from the binary catalog, or the pickle/CSV fallback"""
+        # Resolve the published version once; every file below comes from it
+        store_root = catalog_store.store_path(self.data_path)
+        store_dir = catalog_store.current_version(store_root)
+        if store_dir is None and catalog_store.published_version(store_root) is not None:
+            # e.g. built by another user into a directory the service can't read
+            print(
+                f"Warning: published catalog {catalog_store.published_version(store_root)} is missing or "
+                "unreadable; falling back to the pickle/CSV course data"
+            )
+        if store_dir is not None:
+            # Fast path: Parquet metadata plus a memory-mapped, pre-normalized matrix
+            print(f"Loading binary course catalog from {store_dir}...")
+            metadata, embeddings = catalog_store.read_catalog_store(store_dir)
+            normalized = True
+        else:
+            metadata = catalog_store.read_course_data(self.data_path, model=self.model)
+            embeddings = None
+            normalized = False
+
+        backend = config.SEARCH_BACKEND
+        index_options = {}
+        if backend == "exact" and config.EMBEDDING_PRECISION != "float32" and not is_memory_mapped(embeddings):
+            # The float32 matrix would stay in memory next to the compact one,
+            # using more memory than plain float32 search
+            print(
+                f"ML_EMBEDDING_PRECISION={config.EMBEDDING_PRECISION} needs the memory-mapped binary catalog "
+                "(python -m app.build_catalog); searching in float32"
+            )
+        elif backend == "exact" and config.EMBEDDING_PRECISION != "float32":
+            backend = "quantized"
+            index_options = {"precision": config.EMBEDDING_PRECISION, "rerank_factor": config.RERANK_FACTOR}
+            # Memory-map a compact matrix built by `python -m app.build_catalog --precision` when available
+            compact = QuantizedIndex.load_compact(store_dir, config.EMBEDDING_PRECISION, len(metadata))
+            if compact is not None:
+                index_options["compact"], index_options["scales"] = compact
+        elif backend == "ivf":
+            index_options = {"n_lists": config.IVF_LISTS, "n_probe": config.IVF_PROBES}
+            # Use clusters built offline by `python -m app.build_catalog --ivf` when available
+            clusters = IVFIndex.load_clusters(store_dir, len(metadata)) if store_dir is not None else None
+            if clusters is not None:
+                index_options["centroids"], index_options["assignments"] = clusters
+
+        return CourseCatalog(
+            metadata,
+            embeddings=embeddings,
+            normalized=normalized,
+            backend=backend,
+            index_options=index_options
+        )
+
+    def _set_catalog(self, catalog: CourseCatalog):
+        """Install a catalog snapshot and drop results computed against the old one"""
+        # A single attribute assignment: requests that already read the old
+        # snapshot finish on it, new requests see the new one
+        self.catalog = catalog
+        self.result_cache.clear()
+
+    def reload_catalog(self) -> CourseCatalog:
+        """
+        Rebuild the catalog from disk and swap it in atomically
+
+        The current catalog keeps serving requests while the new one is
+        built. Concurrent reloads are serialized.
+
+        Returns:
+            The newly installed catalog
+        """
+        with self._reload_lock:
+            catalog = self._build_catalog()
+            previous = self.catalog
+            self._set_catalog(catalog)
+        print(
+            f"Reloaded course catalog: version {previous.version if previous else None} -> "
+            f"{catalog.version}, {len(catalog)} courses"
+        )
+        return catalog
+
+    def _get_skill_extractor(self) -> SkillExtractor:
+        """Return the shared skill extractor, loading it once if none was injected"""
+        if self.skill_extractor is None:
+            self.skill_extractor = SkillExtractor()
+        return self.skill_extractor
+
+    def _encode_query(self, text: str) -> np.ndarray:
+        """Encode query text, reusing cached embeddings for repeated queries"""
+        # The model is uncased, so normalizing case and whitespace doesn't change the embedding
+        key = normalize_query(text)
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            with span("encode"):
+                embedding = self.encoder.encode(key)
+            embedding.setflags(write=False)
+            self.embedding_cache.set(key, embedding)
+        return embedding
+
+    def _encode_queries(self, texts: List[str]) -> np.ndarray:
+        """Encode several query texts, batching the ones missing from the embedding cache"""
+        keys = [normalize_query(text) for text in texts]
+        embeddings = [self.embedding_cache.get(key) for key in keys]
+        pending = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if pending:
+            with span("encode"):
+                encoded = self.encoder.encode_many([keys[i] for i in pending])
+            for i, embedding in zip(pending, encoded):
+                embedding.setflags(write=False)
+                self.embedding_cache.set(keys[i], embedding)
+                embeddings[i] = embedding
+        return np.vstack(embeddings)
+
+    def _search_cached(
+        self,
+        kind: str,
+        text: str,
+        top_n: int,
+        detailed: bool,
+        filters: Optional[CourseFilters] = None
+    ) -> List[Dict]:
+        """Run a top-n catalog search, serving repeated (query, top_n, filters) from cache"""
+        catalog = self.catalog
+        key = (kind, catalog.version, normalize_query(text), top_n, filters)
+        results = self.result_cache.get(key)
+        if results is None:
+            # Score against a single catalog snapshot; results are request-local
+            query_embedding = self._encode_query(text)
+            with span("similarity_scan"):
+                indices, similarities = catalog.search(query_embedding, top_n, filters=filters)
+            with span("format_results"):
+                results = catalog.courses(indices, similarities, detailed=detailed)
+            self.result_cache.set(key, results)
+        # Hand out copies so callers can't modify cached results
+        return [dict(course) for course in results]
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics for the query caches"""
+        return {
+            "embeddings": self.embedding_cache.stats(),
+            "results": self.result_cache.stats()
+        }
+
+    def _coverage_cached(
+        self,
+        skills: List[str],
+        top_n: int,
+        filters: Optional[CourseFilters] = None
+    ) -> List[Dict]:
+        """Pick courses covering the skills, serving repeated (skills, top_n, filters) from cache"""
+        catalog = self.catalog
+        skills = sorted(set(normalize_query(skill) for skill in skills))
+        key = ("coverage", catalog.version, tuple(skills), top_n, filters)
+        results = self.result_cache.get(key)
+        if results is None:
+            # Encode every skill in one batch, then score them all in one pass
+            skill_embeddings = self._encode_queries(skills)
+            with span("similarity_scan"):
+                indices, similarities, covered = catalog.coverage_search(skill_embeddings, top_n, filters=filters)
+            with span("format_results"):
+                results = catalog.courses(indices, similarities, detailed=True)
+                for course, rows in zip(results, covered):
+                    course['covered_skills'] = [skills[row] for row in rows]
+            self.result_cache.set(key, results)
+        return [dict(course, covered_skills=list(course['covered_skills'])) for course in results]
 
     def recommend_courses(
         self,
         missing_skills: List[str],
-        top_n: int = 10
+        top_n: int = 10,
+        filters: Optional[CourseFilters] = None,
+        strategy: str = "combined"
     ) -> List[Dict]:
         """
         Recommend courses based on missing skills
@@ -67,61 +234,36 @@ class CourseRecommender:
         Args:
             missing_skills: List of skills the user is missing
             top_n: Number of courses to recommend
+            filters: Only recommend courses matching these metadata filters
+            strategy: "combined" searches with one query joining all skills;
+                "coverage" scores each skill separately and picks courses
+                that together cover the most skills
 
         Returns:
-            List of recommended courses with metadata
+            List of recommended courses with metadata; with the coverage
+            strategy each course also lists its covered_skills
         """
+        if strategy not in RECOMMEND_STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {RECOMMEND_STRATEGIES}")
         if not missing_skills:
             return []
 
-        # Create embedding for missing skills
+        if strategy == "coverage":
+            return self._coverage_cached(missing_skills, top_n, filters=filters)
+
+        # Recommend for one combined query over all missing skills
         missing_skills_text = " ".join(missing_skills)
-        missing_skills_embedding = self.model.encode(missing_skills_text)
-
-        # Get course embeddings
-        # Ensure embeddings are numpy arrays (handle string representations)
-        embeddings_list = []
-        for emb in self.courses_df['Embeddings skills'].values:
-            if isinstance(emb, str):
-                # Parse string representation of array
-                emb = np.fromstring(emb.strip('[]'), sep=' ')
-            elif not isinstance(emb, np.ndarray):
-                emb = np.array(emb)
-            embeddings_list.append(emb)
-        course_embeddings = np.vstack(embeddings_list)
-
-        # Calculate cosine similarity
-        similarities = cosine_similarity([missing_skills_embedding], course_embeddings)[0]
-
-        # Add similarity scores to dataframe
-        self.courses_df['Similarity'] = similarities
-
-        # Sort by similarity and get top N
-        top_courses = self.courses_df.nlargest(top_n, 'Similarity')
-
-        # Format results
-        recommendations = []
-        for _, course in top_courses.iterrows():
-            recommendations.append({
-                'course_name': course['Course Name'],
-                'provider': course['Provider'],
-                'skills_gained': course['Skills Gained'],
-                'rating': float(course['Rating Score']) if pd.notna(course['Rating Score']) else None,
-                'level_duration': course.get('Level & Duration', 'N/A'),
-                'course_url': course['Course Link'],
-                'course_image': course.get('Course Image', ''),
-                'provider_image': course.get('Provider Image', ''),
-                'similarity_score': float(course['Similarity']),
-                'match_percentage': round(float(course['Similarity']) * 100, 2)
-            })
-
-        return recommendations
+        return self._search_cached("recommend", missing_skills_text, top_n, detailed=True, filters=filters)
 
     def recommend_for_job(
         self,
         job_description: str,
         resume_skills: List[str],
-        top_n: int = 10
+        top_n: int = 10,
+        filters: Optional[CourseFilters] = None,
+        compare_mode: str = "exact",
+        match_threshold: Optional[float] = None,
+        strategy: str = "combined"
     ) -> Dict:
         """
         Recommend courses based on job description and current skills
@@ -130,23 +272,33 @@ class CourseRecommender:
             job_description: The job description text
             resume_skills: Skills the user currently has
             top_n: Number of courses to recommend
+            filters: Only recommend courses matching these metadata filters
+            compare_mode: "exact" or "semantic" skill comparison
+            match_threshold: Minimum similarity for a semantic skill match
+            strategy: Course recommendation strategy, see recommend_courses
 
         Returns:
             Dictionary with skill gap analysis and course recommendations
         """
-        # Extract skills from job description using simple keyword matching
-        from .skill_extractor import SkillExtractor
-
-        extractor = SkillExtractor()
+        # Extract skills from job description using the shared extractor
+        extractor = self._get_skill_extractor()
         required_skills = extractor.extract_from_job_description(job_description)
 
         # Compare skills
-        skill_comparison = extractor.compare_skills(resume_skills, required_skills)
+        with span("compare_skills"):
+            skill_comparison = extractor.compare_skills(
+                resume_skills,
+                required_skills,
+                mode=compare_mode,
+                threshold=match_threshold
+            )
 
         # Get course recommendations for missing skills
         recommendations = self.recommend_courses(
             skill_comparison['missing_skills'],
-            top_n=top_n
+            top_n=top_n,
+            filters=filters,
+            strategy=strategy
         )
 
         return {
@@ -156,58 +308,201 @@ class CourseRecommender:
             'match_percentage': skill_comparison['match_percentage']
         }
 
-    def search_courses(self, query: str, top_n: int = 10) -> List[Dict]:
+    def recommend_for_jobs(
+        self,
+        job_descriptions: List[str],
+        resume_skills: List[str],
+        top_n: int = 10,
+        filters: Optional[CourseFilters] = None,
+        compare_mode: str = "exact",
+        match_threshold: Optional[float] = None,
+        strategy: str = "combined",
+        batch_size: int = 32
+    ) -> Dict:
         """
-        Search courses by query string
+        Analyze one set of resume skills against many job descriptions
+
+        Job skills are extracted in one pipelined spaCy pass. With the
+        combined strategy, the missing-skill queries of all jobs are encoded
+        in one batch and scored against the catalog in one matrix product;
+        with the coverage strategy, every distinct missing skill is encoded
+        once. Results also include a course plan merging the per-job
+        recommendations.
 
         Args:
-            query: Search query
-            top_n: Number of results to return
+            job_descriptions: Job description texts
+            resume_skills: Skills the user currently has
+            top_n: Number of courses per job, and in the course plan
+            filters: Only recommend courses matching these metadata filters
+            compare_mode: "exact" or "semantic" skill comparison
+            match_threshold: Minimum similarity for a semantic skill match
+            strategy: Course recommendation strategy, see recommend_courses
+            batch_size: Number of job descriptions spaCy parses per batch
 
         Returns:
-            List of matching courses
+            Dictionary with per-job analyses (in input order), the course
+            plan and how many jobs each missing skill appears in
         """
-        query_embedding = self.model.encode(query)
+        if strategy not in RECOMMEND_STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {RECOMMEND_STRATEGIES}")
+
+        extractor = self._get_skill_extractor()
+        required_skills = extractor.extract_many(job_descriptions, batch_size=batch_size)
+
+        with span("compare_skills"):
+            comparisons = [
+                extractor.compare_skills(resume_skills, skills, mode=compare_mode, threshold=match_threshold)
+                for skills in required_skills
+            ]
+
+        if strategy == "coverage":
+            # Encode each distinct missing skill once for all jobs
+            all_missing = sorted(set().union(*(c['missing_skills'] for c in comparisons)))
+            if all_missing:
+                self._encode_queries(all_missing)
+            recommendations = [
+                self.recommend_courses(c['missing_skills'], top_n=top_n, filters=filters, strategy=strategy)
+                for c in comparisons
+            ]
+        else:
+            recommendations = self._search_many_cached(
+                "recommend",
+                [" ".join(c['missing_skills']) for c in comparisons],
+                top_n,
+                detailed=True,
+                filters=filters
+            )
+
+        jobs = [
+            {
+                'skill_analysis': comparison,
+                'recommended_courses': courses,
+                'missing_skills_count': len(comparison['missing_skills']),
+                'match_percentage': comparison['match_percentage']
+            }
+            for comparison, courses in zip(comparisons, recommendations)
+        ]
+
+        skill_demand: Dict[str, int] = {}
+        for comparison in comparisons:
+            for skill in comparison['missing_skills']:
+                skill_demand[skill] = skill_demand.get(skill, 0) + 1
 
-        # Ensure embeddings are numpy arrays (handle string representations)
-        embeddings_list = []
-        for emb in self.courses_df['Embeddings skills'].values:
-            if isinstance(emb, str):
-                emb = np.fromstring(emb.strip('[]'), sep=' ')
-            elif not isinstance(emb, np.ndarray):
-                emb = np.array(emb)
-            embeddings_list.append(emb)
-        course_embeddings = np.vstack(embeddings_list)
+        return {
+            'jobs': jobs,
+            'course_plan': self._course_plan(recommendations, top_n),
+            'missing_skills': [
+                {'skill': skill, 'jobs': count}
+                for skill, count in sorted(skill_demand.items(), key=lambda item: (-item[1], item[0]))
+            ]
+        }
 
-        similarities = cosine_similarity([query_embedding], course_embeddings)[0]
-        self.courses_df['Similarity'] = similarities
+    def _search_many_cached(
+        self,
+        kind: str,
+        texts: List[str],
+        top_n: int,
+        detailed: bool,
+        filters: Optional[CourseFilters] = None
+    ) -> List[List[Dict]]:
+        """
+        Run _search_cached for many queries, batching all cache misses
 
-        top_courses = self.courses_df.nlargest(top_n, 'Similarity')
+        Misses are encoded together and scored with one catalog matrix
+        product. Empty queries return no courses.
+        """
+        catalog = self.catalog
+        keys = [(kind, catalog.version, normalize_query(text), top_n, filters) for text in texts]
+        results: List[Optional[List[Dict]]] = [
+            self.result_cache.get(key) if key[2] else [] for key in keys
+        ]
+
+        # Identical queries are searched once
+        pending: Dict[str, List[int]] = {}
+        for i, (key, cached) in enumerate(zip(keys, results)):
+            if cached is None:
+                pending.setdefault(key[2], []).append(i)
+
+        if pending:
+            queries = list(pending)
+            query_embeddings = self._encode_queries(queries)
+            with span("similarity_scan"):
+                matches = catalog.search_many(query_embeddings, top_n, filters=filters)
+            with span("format_results"):
+                for query, (indices, similarities) in zip(queries, matches):
+                    courses = catalog.courses(indices, similarities, detailed=detailed)
+                    positions = pending[query]
+                    self.result_cache.set(keys[positions[0]], courses)
+                    for i in positions:
+                        results[i] = courses
+
+        # Hand out copies so callers can't modify cached results
+        return [[dict(course) for course in courses] for courses in results]
+
+    @staticmethod
+    def _course_plan(recommendations: List[List[Dict]], size: int) -> List[Dict]:
+        """
+        Merge per-job recommendations into one deduplicated course list
 
-        results = []
-        for _, course in top_courses.iterrows():
-            results.append({
-                'course_name': course['Course Name'],
-                'provider': course['Provider'],
-                'skills_gained': course['Skills Gained'],
-                'rating': float(course['Rating Score']) if pd.notna(course['Rating Score']) else None,
-                'level_duration': course.get('Level & Duration', 'N/A'),
-                'course_url': course['Course Link'],
-                'course_image': course.get('Course Image', ''),
-                'similarity_score': float(course['Similarity'])
-            })
+        Courses recommended for more jobs come first, then those with the
+        higher best similarity.
+        """
+        plan: Dict[Tuple[str, str], Dict] = {}
+        for job_index, courses in enumerate(recommendations):
+            for course in courses:
+                key = (str(course['course_name']), str(course['course_url']))
+                entry = plan.get(key)
+                if entry is None:
+                    entry = plan[key] = dict(course, jobs=[])
+                    if 'covered_skills' in course:
+                        entry['covered_skills'] = list(course['covered_skills'])
+                elif course['similarity_score'] > entry['similarity_score']:
+                    entry['similarity_score'] = course['similarity_score']
+                    entry['match_percentage'] = course['match_percentage']
+                if 'covered_skills' in course:
+                    entry['covered_skills'] = sorted(set(entry['covered_skills']) | set(course['covered_skills']))
+                if not entry['jobs'] or entry['jobs'][-1] != job_index:
+                    entry['jobs'].append(job_index)
+
+        ranked = sorted(plan.values(), key=lambda entry: (-len(entry['jobs']), -entry['similarity_score']))
+        for entry in ranked:
+            entry['job_count'] = len(entry['jobs'])
+        return ranked[:size]
+
+    def search_courses(
+        self,
+        query: str,
+        top_n: int = 10,
+        filters: Optional[CourseFilters] = None
+    ) -> List[Dict]:
+        """
+        Search courses by query string
 
-        return results
+        Args:
+            query: Search query
+            top_n: Number of results to return
+            filters: Only return courses matching these metadata filters
 
-    def get_course_by_skill(self, skill: str, top_n: int = 5) -> List[Dict]:
+        Returns:
+            List of matching courses
+        """
+        return self._search_cached("search", query, top_n, detailed=False, filters=filters)
+
+    def get_course_by_skill(
+        self,
+        skill: str,
+        top_n: int = 5,
+        filters: Optional[CourseFilters] = None
+    ) -> List[Dict]:
         """
         Get courses that teach a specific skill
 
         Args:
             skill: The skill to search for
             top_n: Number of courses to return
+            filters: Only return courses matching these metadata filters
 
         Returns:
             List of courses teaching that skill
         """
-        return self.search_courses(skill, top_n=top_n)
+        return self.search_courses(skill, top_n=top_n, filters=filters)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .query_cache import LRUCache
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse whitespace, as seen by the skill extractor"""
+    return " ".join(text.lower().split())
+
+
+class ExtractionCache:
+    def __init__(self, max_size: int, namespace: str, db_path: Optional[str] = None, max_age_seconds: float = 0):
+        """
+        Content-addressed cache of skill extraction results
+
+        Results are keyed by a hash of the normalized text and a namespace
+        identifying the skill vocabulary and pipeline, so changing either
+        never serves stale results. An in-process LRU sits in front of an
+        optional SQLite tier that survives restarts and is shared by all
+        workers on the host.
+
+        Args:
+            max_size: Entries kept in the in-process LRU; 0 disables it
+            namespace: Version of the skill vocabulary and pipeline profile
+            db_path: SQLite database file for the on-disk tier; None disables it
+            max_age_seconds: On-disk entries older than this are pruned on
+                open; 0 keeps them
+        """
+        self.namespace = namespace
+        self.memory = LRUCache(max_size)
+        self.db_path = db_path
+        self._local = threading.local()
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+        if self.db_path:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                    "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, skills TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS extraction_cache_created_at ON extraction_cache (created_at)"
+                )
+                # Prune by age rather than namespace: workers running another
+                # profile or taxonomy (e.g. during a rolling deploy) share the file
+                if max_age_seconds > 0:
+                    conn.execute(
+                        "DELETE FROM extraction_cache WHERE created_at < ?", (time.time() - max_age_seconds,)
+                    )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One SQLite connection per thread; WAL lets worker processes read while one writes"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, text: str) -> Optional[List[str]]:
+        """Return cached skills for text, or None"""
+        key = self.key(text)
+        skills = self.memory.get(key)
+        if skills is None and self.db_path:
+            row = self._connection().execute(
+                "SELECT skills FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+            skills = tuple(json.loads(row[0]))
+            self.memory.set(key, skills)
+        return list(skills) if skills is not None else None
+
+    def set(self, text: str, skills: List[str]):
+        key = self.key(text)
+        self.memory.set(key, tuple(skills))
+        if self.db_path:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO extraction_cache (key, namespace, skills, created_at) VALUES (?, ?, ?, ?)",
+                    (key, self.namespace, json.dumps(list(skills)), time.time())
+                )
+
+    def stats(self) -> Dict:
+        stats = {"memory": self.memory.stats()}
+        if self.db_path:
+            lookups = self.disk_hits + self.disk_misses
+            stats["disk"] = {
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+                "hit_ratio": round(self.disk_hits / lookups, 4) if lookups else 0.0
+            }
+        return stats
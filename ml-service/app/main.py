@@ -1,12 +1,29 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional
-import io
-from PyPDF2 import PdfReader
-
+from starlette.middleware.base import BaseHTTPMiddleware
+from typing import List, Literal, Optional
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import hmac
+import os
+import time
+
+from . import config, metrics
 from .skill_extractor import SkillExtractor
 from .course_recommender import CourseRecommender
+from .course_catalog import CourseFilters
+from .catalog_reloader import CatalogReloader
+from .pdf_extraction import (
+    PdfLimitError,
+    extract_page_range,
+    page_ranges,
+    pdf_page_count,
+    spool_upload,
+)
+from .worker_pool import WorkerPool, PoolSaturatedError
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -24,43 +41,176 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Multipart framing around the PDF bytes (boundaries, part headers, filename)
+PDF_UPLOAD_OVERHEAD = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_pdf(request: Request, call_next):
+    """
+    Reject PDF uploads by Content-Length before the multipart body is parsed
+
+    The form parser reads the whole body before the endpoint runs, so the
+    size check in spool_upload only catches uploads sent without a length.
+    """
+    if request.url.path == "/api/extract-skills-from-pdf":
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > config.PDF_MAX_BYTES + PDF_UPLOAD_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"PDF is larger than {config.PDF_MAX_BYTES} bytes"}
+            )
+    return await call_next(request)
+
+
+async def record_request_metrics(request: Request, call_next):
+    """Count and time requests, collecting their stage breakdown"""
+    stages = metrics.start_request()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not the raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.finish_request(request.method, path, status, time.perf_counter() - start, stages)
+
+
+# Only installed when metrics or slow-request logging read the timings, so
+# requests pass through no extra middleware layer otherwise
+if metrics.TIMING:
+    app.add_middleware(BaseHTTPMiddleware, dispatch=record_request_metrics)
+
+
 # Initialize services
 skill_extractor = None
 course_recommender = None
+catalog_reloader = None
+
+# Worker pools: threads for spaCy/encoding, processes for PDF parsing
+inference_pool = None
+pdf_pool = None
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize ML models on startup"""
-    global skill_extractor, course_recommender
+    global skill_extractor, course_recommender, catalog_reloader, inference_pool, pdf_pool
     print("Initializing ML services...")
+    inference_pool = WorkerPool.threads("inference", config.THREAD_WORKERS, config.MAX_QUEUE_DEPTH)
+    pdf_pool = WorkerPool.processes("pdf", config.PROCESS_WORKERS, config.MAX_QUEUE_DEPTH)
     skill_extractor = SkillExtractor()
-    course_recommender = CourseRecommender()
+    # Share one spaCy pipeline and matcher across all endpoints
+    course_recommender = CourseRecommender(skill_extractor=skill_extractor)
+    # Semantic skill comparison encodes through the recommender's batching encoder
+    skill_extractor.attach_encoder(course_recommender.encoder.encode_many)
+    catalog_reloader = CatalogReloader(course_recommender, watch_interval=config.CATALOG_WATCH_INTERVAL)
+    catalog_reloader.start_watching()
     print("ML services initialized successfully!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop worker pools and the encoding thread on shutdown"""
+    if catalog_reloader is not None:
+        catalog_reloader.stop()
+    for pool in (inference_pool, pdf_pool):
+        if pool is not None:
+            pool.shutdown()
+    if course_recommender is not None:
+        course_recommender.close()
+
+
+async def run_in_pool(pool: WorkerPool, fn, *args, **kwargs):
+    """Run blocking work on a worker pool, rejecting with 503 when it is saturated"""
+    try:
+        return await pool.run(fn, *args, **kwargs)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def submit_to_pool(pool: WorkerPool, fn, *args, **kwargs) -> Future:
+    """Submit blocking work to a worker pool, rejecting with 503 when it is saturated"""
+    try:
+        return pool.submit(fn, *args, **kwargs)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def check_admin_token(token: Optional[str]):
+    """
+    Reject admin requests without the configured ML_ADMIN_TOKEN
+
+    Admin endpoints are disabled (404) unless a token is configured, so a
+    deployment without one can't be made to rebuild its catalog.
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if token is None or not hmac.compare_digest(token.encode("utf-8"), config.ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
 # Request/Response Models
 class TextRequest(BaseModel):
     text: str
 
 
+class BatchTextRequest(BaseModel):
+    texts: List[str]
+    batch_size: int = 32
+
+
 class SkillsRequest(BaseModel):
     resume_skills: List[str]
     job_skills: List[str]
+    mode: Literal["exact", "semantic"] = "exact"
+    threshold: Optional[float] = None
+
+
+class CourseFilterFields(BaseModel):
+    """Optional course metadata filters, applied before top-n selection"""
+    provider: Optional[str] = None
+    min_rating: Optional[float] = None
+    level: Optional[str] = None
+    duration: Optional[str] = None
+
+    def course_filters(self) -> Optional[CourseFilters]:
+        return CourseFilters.create(
+            provider=self.provider,
+            min_rating=self.min_rating,
+            level=self.level,
+            duration=self.duration
+        )
 
 
-class CourseRecommendationRequest(BaseModel):
+class CourseRecommendationRequest(CourseFilterFields):
     missing_skills: List[str]
     top_n: int = 10
+    strategy: Literal["combined", "coverage"] = "combined"
 
 
-class JobAnalysisRequest(BaseModel):
+class JobAnalysisRequest(CourseFilterFields):
     job_description: str
     resume_skills: List[str]
     top_n: int = 10
+    compare_mode: Literal["exact", "semantic"] = "exact"
+    match_threshold: Optional[float] = None
+    strategy: Literal["combined", "coverage"] = "combined"
 
 
-class SearchCoursesRequest(BaseModel):
+class JobsAnalysisRequest(CourseFilterFields):
+    job_descriptions: List[str]
+    resume_skills: List[str]
+    top_n: int = 10
+    compare_mode: Literal["exact", "semantic"] = "exact"
+    match_threshold: Optional[float] = None
+    strategy: Literal["combined", "coverage"] = "combined"
+
+
+class SearchCoursesRequest(CourseFilterFields):
     query: str
     top_n: int = 10
 
@@ -80,21 +230,82 @@ async def health_check():
     return {
         "status": "healthy",
         "skill_extractor": skill_extractor is not None,
-        "course_recommender": course_recommender is not None
+        "course_recommender": course_recommender is not None,
+        "pools": {
+            pool.name: pool.stats() for pool in (inference_pool, pdf_pool) if pool is not None
+        }
     }
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss statistics for the course query and skill extraction caches"""
+    return {
+        "success": True,
+        "cache": course_recommender.cache_stats() if course_recommender is not None else None,
+        "extraction": skill_extractor.cache.stats() if skill_extractor is not None else None
+    }
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request, stage latency, cache and worker pool metrics in Prometheus format"""
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+
+    if course_recommender is not None:
+        for name, stats in course_recommender.cache_stats().items():
+            metrics.set_cache_stats(name, stats)
+    if skill_extractor is not None:
+        for tier, stats in skill_extractor.cache.stats().items():
+            metrics.set_cache_stats(f"extraction_{tier}", stats)
+    for pool in (inference_pool, pdf_pool):
+        if pool is not None:
+            metrics.set_pool_stats(pool.name, pool.stats())
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
 # Skill extraction endpoints
 @app.post("/api/extract-skills")
 async def extract_skills(request: TextRequest):
     """Extract skills from text (resume or job description)"""
     try:
-        skills = skill_extractor.extract_from_text(request.text)
+        skills = await run_in_pool(inference_pool, skill_extractor.extract_from_text, request.text)
         return {
             "success": True,
             "skills": skills,
             "count": len(skills)
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/extract-skills/batch")
+async def extract_skills_batch(request: BatchTextRequest):
+    """Extract skills from many texts in one pipelined pass, preserving input order"""
+    if len(request.texts) > config.BATCH_MAX_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.BATCH_MAX_TEXTS} texts can be processed per request"
+        )
+    try:
+        # Always parse in-process: spaCy's n_process forks from this thread
+        # while torch and the encoder thread are running
+        results = await run_in_pool(
+            inference_pool,
+            skill_extractor.extract_many,
+            request.texts,
+            batch_size=max(1, request.batch_size)
+        )
+        return {
+            "success": True,
+            "results": [{"skills": skills, "count": len(skills)} for skills in results],
+            "count": len(results)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -102,46 +313,119 @@ async def extract_skills(request: TextRequest):
 @app.post("/api/extract-skills-from-pdf")
 async def extract_skills_from_pdf(file: UploadFile = File(...)):
     """Extract skills from uploaded PDF resume"""
+    pdf_path = None
+    pdf_jobs: List[Future] = []
     try:
-        # Read PDF file
-        pdf_bytes = await file.read()
-        pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
-
-        # Extract text from all pages
-        resume_text = ""
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text:
-                resume_text += text + "\n"
-
-        if not resume_text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF")
-
-        # Extract skills
-        skills = skill_extractor.extract_from_resume(resume_text)
+        # Spool the upload to a bounded temp file instead of holding it in memory
+        with metrics.span("pdf_upload"):
+            pdf_path = await spool_upload(file, config.PDF_MAX_BYTES)
+        skills, text_length = await asyncio.wait_for(
+            _extract_pdf_skills(pdf_path, pdf_jobs),
+            timeout=config.PDF_TIMEOUT_SECONDS
+        )
 
         return {
             "success": True,
             "skills": skills,
             "count": len(skills),
-            "text_length": len(resume_text)
+            "text_length": text_length
         }
+    except PdfLimitError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except asyncio.TimeoutError:
+        # Cancelling the wait doesn't stop a parser already running in a worker
+        # process; replace the workers so a stuck PDF doesn't hold a pool slot
+        if any(job.running() for job in pdf_jobs):
+            pdf_pool.recycle()
+        raise HTTPException(
+            status_code=408,
+            detail=f"PDF processing took longer than {config.PDF_TIMEOUT_SECONDS} seconds"
+        )
+    except BrokenProcessPool:
+        # Another request's timeout recycled the PDF workers under this one
+        raise HTTPException(
+            status_code=503,
+            detail="PDF workers were restarted, please retry",
+            headers={"Retry-After": "1"}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if pdf_path is not None:
+            os.remove(pdf_path)
+
+
+async def _extract_pdf_skills(pdf_path: str, pdf_jobs: List[Future]):
+    """
+    Extract skills from a spooled PDF
+
+    Page ranges are parsed in parallel on the process pool. Each range is
+    handed to the skill extractor as soon as its text is ready.
+
+    Args:
+        pdf_path: Spooled PDF file
+        pdf_jobs: Collects the process pool tasks, so the caller can tell
+            whether parsing is still running after a timeout
+
+    Returns:
+        Tuple of (sorted skills, extracted text length)
+    """
+    async def run_pdf(fn, *args):
+        job = submit_to_pool(pdf_pool, fn, *args)
+        pdf_jobs.append(job)
+        return await asyncio.wrap_future(job)
+
+    page_count = await run_pdf(pdf_page_count, pdf_path)
+    if page_count > config.PDF_MAX_PAGES:
+        raise PdfLimitError(f"PDF has {page_count} pages; at most {config.PDF_MAX_PAGES} are accepted")
+
+    page_tasks = [
+        asyncio.ensure_future(run_pdf(extract_page_range, pdf_path, start, end))
+        for start, end in page_ranges(page_count, config.PDF_PAGES_PER_TASK)
+    ]
+    skill_tasks = []
+    text_length = 0
+    try:
+        for page_task in asyncio.as_completed(page_tasks):
+            text = await page_task
+            text_length += len(text)
+            if text.strip():
+                skill_tasks.append(asyncio.ensure_future(
+                    run_in_pool(inference_pool, skill_extractor.extract_from_resume, text)
+                ))
+
+        if not skill_tasks:
+            raise HTTPException(status_code=400, detail="Could not extract text from PDF")
+
+        skill_lists = await asyncio.gather(*skill_tasks)
+    finally:
+        for task in page_tasks + skill_tasks:
+            task.cancel()
+
+    skills = sorted(set().union(*skill_lists))
+    return skills, text_length
 
 
 @app.post("/api/compare-skills")
 async def compare_skills(request: SkillsRequest):
     """Compare resume skills with job requirements"""
     try:
-        comparison = skill_extractor.compare_skills(
+        comparison = await run_in_pool(
+            inference_pool,
+            skill_extractor.compare_skills,
             request.resume_skills,
-            request.job_skills
+            request.job_skills,
+            mode=request.mode,
+            threshold=request.threshold
         )
         return {
             "success": True,
             "comparison": comparison
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -151,15 +435,21 @@ async def compare_skills(request: SkillsRequest):
 async def recommend_courses(request: CourseRecommendationRequest):
     """Recommend courses based on missing skills"""
     try:
-        recommendations = course_recommender.recommend_courses(
+        recommendations = await run_in_pool(
+            inference_pool,
+            course_recommender.recommend_courses,
             request.missing_skills,
-            top_n=request.top_n
+            top_n=request.top_n,
+            filters=request.course_filters(),
+            strategy=request.strategy
         )
         return {
             "success": True,
             "courses": recommendations,
             "count": len(recommendations)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -171,15 +461,59 @@ async def analyze_job(request: JobAnalysisRequest):
     This is the main endpoint combining skill analysis + course recommendations
     """
     try:
-        analysis = course_recommender.recommend_for_job(
+        analysis = await run_in_pool(
+            inference_pool,
+            course_recommender.recommend_for_job,
             job_description=request.job_description,
             resume_skills=request.resume_skills,
-            top_n=request.top_n
+            top_n=request.top_n,
+            filters=request.course_filters(),
+            compare_mode=request.compare_mode,
+            match_threshold=request.match_threshold,
+            strategy=request.strategy
         )
         return {
             "success": True,
             **analysis
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/analyze-jobs")
+async def analyze_jobs(request: JobsAnalysisRequest):
+    """
+    Analyze many job postings against one set of resume skills
+
+    Returns the analysis of each job, in input order, plus a deduplicated
+    course plan across all of them.
+    """
+    if len(request.job_descriptions) > config.BATCH_MAX_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.BATCH_MAX_TEXTS} job descriptions can be analyzed per request"
+        )
+    try:
+        analysis = await run_in_pool(
+            inference_pool,
+            course_recommender.recommend_for_jobs,
+            job_descriptions=request.job_descriptions,
+            resume_skills=request.resume_skills,
+            top_n=request.top_n,
+            filters=request.course_filters(),
+            compare_mode=request.compare_mode,
+            match_threshold=request.match_threshold,
+            strategy=request.strategy
+        )
+        return {
+            "success": True,
+            **analysis,
+            "count": len(analysis["jobs"])
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -188,34 +522,82 @@ async def analyze_job(request: JobAnalysisRequest):
 async def search_courses(request: SearchCoursesRequest):
     """Search for courses by keyword or skill"""
     try:
-        results = course_recommender.search_courses(
+        results = await run_in_pool(
+            inference_pool,
+            course_recommender.search_courses,
             query=request.query,
-            top_n=request.top_n
+            top_n=request.top_n,
+            filters=request.course_filters()
         )
         return {
             "success": True,
             "courses": results,
             "count": len(results)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/courses/by-skill/{skill}")
-async def get_courses_by_skill(skill: str, top_n: int = 5):
+async def get_courses_by_skill(
+    skill: str,
+    top_n: int = 5,
+    provider: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    level: Optional[str] = None,
+    duration: Optional[str] = None
+):
     """Get courses that teach a specific skill"""
     try:
-        courses = course_recommender.get_course_by_skill(skill, top_n=top_n)
+        courses = await run_in_pool(
+            inference_pool,
+            course_recommender.get_course_by_skill,
+            skill,
+            top_n=top_n,
+            filters=CourseFilters.create(
+                provider=provider,
+                min_rating=min_rating,
+                level=level,
+                duration=duration
+            )
+        )
         return {
             "success": True,
             "skill": skill,
             "courses": courses,
             "count": len(courses)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Admin endpoints
+@app.post("/api/admin/reload-catalog", status_code=202)
+async def reload_catalog(x_admin_token: Optional[str] = Header(None)):
+    """Rebuild the course catalog in the background and swap it in when ready"""
+    check_admin_token(x_admin_token)
+    started = catalog_reloader.trigger()
+    return {
+        "success": True,
+        "started": started,
+        "status": catalog_reloader.status()
+    }
+
+
+@app.get("/api/admin/catalog")
+async def catalog_status(x_admin_token: Optional[str] = Header(None)):
+    """Status of the loaded course catalog and the last reload"""
+    check_admin_token(x_admin_token)
+    return {
+        "success": True,
+        "status": catalog_reloader.status()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,111 @@
+"""
+Request and per-stage latency metrics, exported in Prometheus format
+
+Stages are timed with span(); durations go to a histogram and, while a
+request is being handled, into that request's stage breakdown for the slow
+request log. With ML_METRICS_ENABLED off and no ML_SLOW_REQUEST_MS, span()
+returns a shared no-op context manager and the request timing middleware is
+not installed.
+"""
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from . import config
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+except ImportError:
+    prometheus_client_available = False
+else:
+    prometheus_client_available = True
+
+ENABLED = config.METRICS_ENABLED and prometheus_client_available
+# Stage timing is also needed for the slow request log
+TIMING = ENABLED or config.SLOW_REQUEST_MS > 0
+
+# Stage durations of the current request, shared by reference with worker threads
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+_NOOP = contextlib.nullcontext()
+
+# Stages take anywhere from tens of microseconds (cache lookups) to seconds (PDF parsing)
+_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if ENABLED:
+    STAGE_SECONDS = Histogram(
+        "ml_stage_duration_seconds", "Time spent in each processing stage", ["stage"], buckets=_BUCKETS
+    )
+    REQUEST_SECONDS = Histogram(
+        "ml_request_duration_seconds", "HTTP request latency", ["method", "path"], buckets=_BUCKETS
+    )
+    REQUESTS = Counter("ml_requests_total", "HTTP requests handled", ["method", "path", "status"])
+    IN_FLIGHT = Gauge("ml_requests_in_flight", "HTTP requests currently being handled")
+    CACHE_HIT_RATIO = Gauge("ml_cache_hit_ratio", "Cache hit ratio since startup", ["cache"])
+    CACHE_LOOKUPS = Gauge("ml_cache_lookups", "Cache lookups since startup", ["cache", "result"])
+    POOL_PENDING = Gauge("ml_pool_pending_tasks", "Running plus queued worker pool tasks", ["pool"])
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        if ENABLED:
+            STAGE_SECONDS.labels(self.stage).observe(elapsed)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages[self.stage] = stages.get(self.stage, 0.0) + elapsed
+        return False
+
+
+def span(stage: str):
+    """Context manager timing one processing stage"""
+    return _Span(stage) if TIMING else _NOOP
+
+
+def start_request() -> Optional[Dict[str, float]]:
+    """Begin collecting the stage breakdown of the current request"""
+    if not TIMING:
+        return None
+    stages: Dict[str, float] = {}
+    _request_stages.set(stages)
+    if ENABLED:
+        IN_FLIGHT.inc()
+    return stages
+
+
+def finish_request(method: str, path: str, status: int, elapsed: float, stages: Optional[Dict[str, float]]):
+    """Record a finished request and log it if it was slow"""
+    if ENABLED:
+        IN_FLIGHT.dec()
+        REQUESTS.labels(method, path, str(status)).inc()
+        REQUEST_SECONDS.labels(method, path).observe(elapsed)
+
+    if config.SLOW_REQUEST_MS > 0 and elapsed * 1000 >= config.SLOW_REQUEST_MS:
+        breakdown = ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in (stages or {}).items())
+        print(f"Slow request: {method} {path} -> {status} in {elapsed * 1000:.1f}ms [{breakdown}]")
+
+
+def set_cache_stats(cache: str, stats: Dict):
+    """Export hit/miss counts of an LRUCache-style stats dict"""
+    CACHE_HIT_RATIO.labels(cache).set(stats["hit_ratio"])
+    CACHE_LOOKUPS.labels(cache, "hit").set(stats["hits"])
+    CACHE_LOOKUPS.labels(cache, "miss").set(stats["misses"])
+
+
+def set_pool_stats(pool: str, stats: Dict):
+    POOL_PENDING.labels(pool).set(stats["pending"])
+
+
+def render() -> bytes:
+    """Current metrics in the Prometheus text format"""
+    return generate_latest()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+from typing import List, Tuple
+from fastapi import UploadFile
+from PyPDF2 import PdfReader
+
+
+class PdfLimitError(ValueError):
+    """Raised when an uploaded PDF exceeds a configured size, page or time limit"""
+
+    def __init__(self, message: str, status_code: int = 413):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def spool_upload(file: UploadFile, max_bytes: int, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Copy an upload to a temporary file in chunks, enforcing a size limit
+
+    Args:
+        file: Uploaded file
+        max_bytes: Maximum accepted size in bytes
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Path of the temporary file; the caller must delete it
+
+    Raises:
+        PdfLimitError: If the upload is larger than max_bytes
+    """
+    size = 0
+    with tempfile.NamedTemporaryFile(prefix="resume-", suffix=".pdf", delete=False) as spool:
+        try:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise PdfLimitError(f"PDF is larger than {max_bytes} bytes")
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            os.remove(spool.name)
+            raise
+    return spool.name
+
+
+def page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Split pages into [start, end) ranges for parallel extraction"""
+    pages_per_task = max(1, pages_per_task)
+    return [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+
+def pdf_page_count(path: str) -> int:
+    """Count the pages of a PDF file (runs in a worker process)"""
+    return len(PdfReader(path).pages)
+
+
+def extract_page_range(path: str, start: int, end: int) -> str:
+    """
+    Extract text from pages [start, end) of a PDF file
+
+    Runs in a worker process, so it only takes and returns plain data.
+
+    Returns:
+        Text of the pages, one page per line block
+    """
+    pdf_reader = PdfReader(path)
+
+    text_parts = []
+    for page in pdf_reader.pages[start:end]:
+        text = page.extract_text()
+        if text:
+            text_parts.append(text + "\n")
+    return "".join(text_parts)
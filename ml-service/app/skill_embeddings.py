@@ -0,0 +1,84 @@
+import os
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .query_cache import LRUCache
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SkillEmbeddings:
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        known_skills: Sequence[str] = (),
+        cache_size: int = 4096,
+        cache_path: Optional[str] = None
+    ):
+        """
+        Normalized embeddings of skill names for semantic skill comparison
+
+        Known skills (the taxonomy) are encoded once up front; any other
+        skill is encoded on first use and kept in an LRU cache.
+
+        Args:
+            encode: Function mapping a list of texts to an embedding matrix
+            known_skills: Skill names to precompute
+            cache_size: Unknown skill embeddings kept in memory
+            cache_path: .npy file caching the known skill matrix across restarts
+        """
+        self.encode = encode
+        self.known: Dict[str, int] = {skill: i for i, skill in enumerate(dict.fromkeys(known_skills))}
+        self.matrix = self._load_known(list(self.known), cache_path)
+        self.cache = LRUCache(cache_size)
+
+    def _load_known(self, skills: List[str], cache_path: Optional[str]) -> np.ndarray:
+        if cache_path and os.path.exists(cache_path):
+            matrix = np.load(cache_path)
+            if matrix.shape[0] == len(skills):
+                return matrix
+
+        matrix = _normalize_rows(self.encode(skills)) if skills else np.empty((0, 0), dtype=np.float32)
+        if cache_path and skills:
+            try:
+                tmp_path = f"{cache_path}.tmp.npy"
+                np.save(tmp_path, matrix)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Could not write skill embeddings to {cache_path}: {e}")
+        return matrix
+
+    def embed(self, skills: Sequence[str]) -> np.ndarray:
+        """
+        Normalized embeddings for skills, in input order
+
+        Skills that are neither precomputed nor cached are encoded together
+        in one batch.
+        """
+        rows: List[Optional[np.ndarray]] = [None] * len(skills)
+        pending = []
+        for i, skill in enumerate(skills):
+            known = self.known.get(skill)
+            if known is not None:
+                rows[i] = self.matrix[known]
+                continue
+            cached = self.cache.get(skill)
+            if cached is not None:
+                rows[i] = cached
+            else:
+                pending.append(i)
+
+        if pending:
+            encoded = _normalize_rows(self.encode([skills[i] for i in pending]))
+            for i, embedding in zip(pending, encoded):
+                rows[i] = embedding
+                self.cache.set(skills[i], embedding)
+
+        if not rows:
+            return np.empty((0, self.matrix.shape[1] if self.matrix.size else 0), dtype=np.float32)
+        return np.vstack(rows)
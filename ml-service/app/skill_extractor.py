@@ -1,7 +1,16 @@
 import spacy
-from spacy.matcher import PhraseMatcher
-from rapidfuzz import fuzz
-from typing import List
+import numpy as np
+from typing import Callable, List, Optional
+
+from . import config
+from .metrics import span
+from .extraction_cache import ExtractionCache, normalize_text
+from .skill_embeddings import SkillEmbeddings
+from .skill_taxonomy import load_taxonomy
+
+# Bump when extraction of the same text can give different results, so
+# cached results from the previous behaviour are not served
+EXTRACTION_VERSION = 2
 
 # Known technical skills database
 KNOWN_SKILLS = [
@@ -44,20 +53,50 @@ KNOWN_SKILLS = [
     "jest", "mocha", "chai", "pytest", "junit", "selenium", "cypress", "playwright",
 ]
 
+# Minimum fuzz.partial_ratio score (exclusive) for a fuzzy skill match
+FUZZY_THRESHOLD = 85
+
+# Pipeline components whose output the extractor never reads
+UNUSED_COMPONENTS = ("ner",)
+
+# spaCy pipeline profiles:
+#   full         - every component of en_core_web_md
+#   standard     - only what lemmas and noun chunks need (tok2vec, tagger, parser, lemmatizer)
+#   matcher-only - tokenizer only; fuzzy matching uses token text and noun chunks are skipped
+PIPELINE_PROFILES = ("full", "standard", "matcher-only")
+
+# compare_skills modes: exact lowercase matching, or embedding similarity
+COMPARE_MODES = ("exact", "semantic")
+
 class SkillExtractor:
-    def __init__(self):
-        """Initialize the skill extractor with spaCy model"""
-        try:
-            self.nlp = spacy.load("en_core_web_md")
-        except OSError:
-            print("Downloading spaCy model...")
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_md"])
-            self.nlp = spacy.load("en_core_web_md")
+    def __init__(self, profile: Optional[str] = None, taxonomy_path: Optional[str] = None):
+        """
+        Initialize the skill extractor with spaCy model
+
+        Args:
+            profile: spaCy pipeline profile, one of PIPELINE_PROFILES;
+                defaults to the ML_SPACY_PROFILE setting
+            taxonomy_path: Skill taxonomy JSON/CSV file; defaults to the
+                ML_SKILL_TAXONOMY setting, or KNOWN_SKILLS if that is unset
+        """
+        self.profile = profile or config.SPACY_PROFILE
+        if self.profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unknown spaCy profile '{self.profile}', expected one of {PIPELINE_PROFILES}")
 
-        self.matcher = PhraseMatcher(self.nlp.vocab)
-        patterns = [self.nlp.make_doc(skill) for skill in KNOWN_SKILLS]
-        self.matcher.add("SKILLS", patterns)
+        self.nlp = self._load_pipeline(self.profile)
+        # Without a tagger and parser there are no lemmas or noun chunks to use
+        self.use_parse = self.profile != "matcher-only"
+        print(f"Loaded spaCy profile '{self.profile}' with components: {self.nlp.pipe_names}")
+
+        self.disabled_components = [name for name in self.nlp.pipe_names if name in UNUSED_COMPONENTS]
+
+        # Exact phrase matching uses a token trie compiled with the pipeline's tokenizer
+        self.taxonomy_path = taxonomy_path or config.SKILL_TAXONOMY or None
+        self.taxonomy = load_taxonomy(
+            self.taxonomy_path,
+            tokenize=lambda phrase: [token.text for token in self.nlp.tokenizer(phrase)],
+            default_skills=KNOWN_SKILLS
+        )
 
         # Terms to filter out from extracted skills
         self.irrelevant_terms = [
@@ -68,6 +107,51 @@ class SkillExtractor:
             "year", "position", "role", "company", "business", "development", "engineer"
         ]
 
+        # Results for previously seen texts, keyed by content hash + taxonomy + profile
+        self.cache = ExtractionCache(
+            config.EXTRACTION_CACHE_SIZE,
+            namespace=f"{self.taxonomy.version}:{self.profile}:{EXTRACTION_VERSION}",
+            db_path=config.EXTRACTION_CACHE_DB or None,
+            max_age_seconds=config.EXTRACTION_CACHE_MAX_AGE_SECONDS
+        )
+
+        # Set by attach_encoder(); needed for semantic compare_skills
+        self.skill_embeddings = None
+
+    def attach_encoder(self, encode: Callable[[List[str]], np.ndarray]):
+        """
+        Enable semantic skill comparison, precomputing taxonomy skill embeddings
+
+        Args:
+            encode: Function mapping a list of texts to an embedding matrix,
+                normally the course recommender's batching encoder
+        """
+        cache_path = None
+        if self.taxonomy_path:
+            cache_path = f"{self.taxonomy_path}.{self.taxonomy.version}.embeddings.npy"
+        self.skill_embeddings = SkillEmbeddings(
+            encode,
+            known_skills=self.taxonomy.names,
+            cache_size=config.EMBEDDING_CACHE_SIZE,
+            cache_path=cache_path
+        )
+        print(f"Precomputed embeddings for {len(self.skill_embeddings.known)} known skills")
+
+    @staticmethod
+    def _load_pipeline(profile: str):
+        """Load the spaCy pipeline for a profile, downloading the model if needed"""
+        if profile == "matcher-only":
+            return spacy.blank("en")
+
+        exclude = list(UNUSED_COMPONENTS) if profile == "standard" else []
+        try:
+            return spacy.load("en_core_web_md", exclude=exclude)
+        except OSError:
+            print("Downloading spaCy model...")
+            import subprocess
+            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_md"])
+            return spacy.load("en_core_web_md", exclude=exclude)
+
     def extract_from_text(self, text: str) -> List[str]:
         """
         Extract technical skills from given text
@@ -81,21 +165,75 @@ class SkillExtractor:
         if not text or not isinstance(text, str):
             return []
 
-        text = text.lower()
-        doc = self.nlp(text)
+        # Parse exactly the text the cache key is computed from, so texts
+        # sharing a key (e.g. differing only in line breaks) share a result
+        text = normalize_text(text)
+        with span("extraction_cache"):
+            skills = self.cache.get(text)
+        if skills is None:
+            with span("spacy_parse"):
+                doc = self.nlp(text, disable=self.disabled_components)
+            skills = self._skills_from_doc(doc)
+            with span("extraction_cache"):
+                self.cache.set(text, skills)
+        return skills
+
+    def extract_many(self, texts: List[str], batch_size: int = 32, n_process: int = 1) -> List[List[str]]:
+        """
+        Extract technical skills from many texts in one spaCy pipeline pass
+
+        Args:
+            texts: Input texts (resumes, job descriptions, etc.)
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of processes spaCy uses for parsing. spaCy
+                starts them with the platform default (fork on Linux), so
+                use more than one only from offline scripts, not from the
+                service's worker threads
+
+        Returns:
+            List of extracted skills for each text, in input order
+        """
+        results = [[] for _ in texts]
+
+        # Only texts that aren't cached go through the pipeline
+        texts = [normalize_text(text) if text and isinstance(text, str) else None for text in texts]
+        pending = []
+        for i, text in enumerate(texts):
+            if text is not None:
+                skills = self.cache.get(text)
+                if skills is None:
+                    pending.append(i)
+                else:
+                    results[i] = skills
+
+        docs = iter(self.nlp.pipe(
+            (texts[i] for i in pending),
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=self.disabled_components
+        ))
+        for i in pending:
+            # Docs are parsed lazily, batch by batch, as they are consumed
+            with span("spacy_parse"):
+                doc = next(docs)
+            results[i] = self._skills_from_doc(doc)
+            self.cache.set(texts[i], results[i])
+        return results
 
-        # Find direct matches using PhraseMatcher
-        matches = self.matcher(doc)
-        matched_skills = [doc[start:end].text for _, start, end in matches]
+    def _skills_from_doc(self, doc) -> List[str]:
+        """Extract skills from a lowercased, parsed spaCy Doc"""
+        # Find direct matches of taxonomy names and aliases
+        with span("phrase_match"):
+            matched_skills = self.taxonomy.match([token.text for token in doc])
 
         # Extract lemmatized tokens
         lemmatized_tokens = [
-            token.lemma_ for token in doc
+            token.lemma_ if self.use_parse else token.text for token in doc
             if not token.is_stop and not token.is_punct
         ]
 
         # Extract noun chunks
-        noun_chunks = [chunk.text for chunk in doc.noun_chunks]
+        noun_chunks = [chunk.text for chunk in doc.noun_chunks] if self.use_parse else []
 
         # Filter out irrelevant noun chunks
         filtered_noun_chunks = [
@@ -107,10 +245,8 @@ class SkillExtractor:
         all_skills = set(matched_skills + filtered_noun_chunks)
 
         # Add fuzzy matches for known skills
-        fuzzy_matches = [
-            skill for skill in KNOWN_SKILLS
-            if any(fuzz.partial_ratio(skill, token) > 85 for token in lemmatized_tokens)
-        ]
+        with span("fuzzy_match"):
+            fuzzy_matches = self.taxonomy.fuzzy_match(lemmatized_tokens, FUZZY_THRESHOLD)
 
         combined_skills = list(set(all_skills).union(fuzzy_matches))
 
@@ -130,13 +266,36 @@ class SkillExtractor:
         """Extract required skills from job description"""
         return self.extract_from_text(job_description)
 
-    def compare_skills(self, resume_skills: List[str], job_skills: List[str]) -> dict:
+    def compare_skills(
+        self,
+        resume_skills: List[str],
+        job_skills: List[str],
+        mode: str = "exact",
+        threshold: Optional[float] = None
+    ) -> dict:
         """
         Compare resume skills with job requirements
 
+        Args:
+            resume_skills: Skills the candidate has
+            job_skills: Skills the job requires
+            mode: "exact" matches lowercase names; "semantic" matches a job
+                skill to its most similar resume skill by embedding
+            threshold: Minimum cosine similarity for a semantic match;
+                defaults to the ML_SEMANTIC_MATCH_THRESHOLD setting
+
         Returns:
             Dictionary with matched, missing, and extra skills
         """
+        if mode not in COMPARE_MODES:
+            raise ValueError(f"Unknown compare mode '{mode}', expected one of {COMPARE_MODES}")
+        if mode == "semantic":
+            return self._compare_semantic(
+                resume_skills,
+                job_skills,
+                config.SEMANTIC_MATCH_THRESHOLD if threshold is None else threshold
+            )
+
         resume_set = set([s.lower() for s in resume_skills])
         job_set = set([s.lower() for s in job_skills])
 
@@ -155,3 +314,58 @@ class SkillExtractor:
             "total_required": len(job_set),
             "total_matched": len(matched)
         }
+
+    def _compare_semantic(self, resume_skills: List[str], job_skills: List[str], threshold: float) -> dict:
+        """
+        Match each job skill to its most similar resume skill
+
+        Both lists are embedded in one batch and compared with a single
+        (job x resume) similarity matrix product.
+        """
+        if self.skill_embeddings is None:
+            raise RuntimeError("Semantic comparison needs an encoder; call attach_encoder() first")
+
+        resume = sorted(set(s.lower() for s in resume_skills))
+        job = sorted(set(s.lower() for s in job_skills))
+
+        skill_scores = []
+        matched, missing, extra = [], [], list(resume)
+        if job and resume:
+            with span("encode"):
+                embeddings = self.skill_embeddings.embed(job + resume)
+            with span("skill_similarity"):
+                similarity = embeddings[:len(job)] @ embeddings[len(job):].T
+            best = similarity.argmax(axis=1)
+            best_scores = similarity[np.arange(len(job)), best]
+            # Identical names always match, whatever rounding does to their similarity
+            is_match = (best_scores >= threshold) | np.isin(job, resume)
+
+            for skill, match_idx, score, ok in zip(job, best, best_scores, is_match):
+                (matched if ok else missing).append(skill)
+                skill_scores.append({
+                    "skill": skill,
+                    "best_match": resume[match_idx],
+                    "score": round(float(score), 4),
+                    "matched": bool(ok)
+                })
+
+            # A resume skill is extra if it is not the best match of any matched job skill
+            used = set(int(i) for i in best[is_match])
+            extra = [skill for i, skill in enumerate(resume) if i not in used]
+        else:
+            missing = list(job)
+            skill_scores = [{"skill": skill, "best_match": None, "score": 0.0, "matched": False} for skill in job]
+
+        match_percentage = (len(matched) / len(job) * 100) if job else 0
+
+        return {
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "extra_skills": extra,
+            "match_percentage": round(match_percentage, 2),
+            "total_required": len(job),
+            "total_matched": len(matched),
+            "mode": "semantic",
+            "threshold": threshold,
+            "skill_scores": skill_scores
+        }
@@ -0,0 +1,311 @@
+import csv
+import hashlib
+import json
+import os
+import pickle
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Bump when the compiled layout changes so stale compiled files are rebuilt
+COMPILED_FORMAT = 3
+
+# Marks the end of a phrase in a trie node; never a token, since tokens are non-empty
+_END = ""
+
+# Taxonomies with more fuzzy terms than this score each token only against a
+# capped set of trigram-sharing candidates; smaller ones score every term against every token
+FUZZY_FULL_SCAN_LIMIT = 5000
+# Most terms scored against one token above FUZZY_FULL_SCAN_LIMIT
+FUZZY_MAX_CANDIDATES = 64
+# Longest trigram posting list read per token; longer ones keep the terms nearest the token's length
+FUZZY_MAX_POSTINGS = 1024
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SkillTaxonomy:
+    def __init__(self, skills: Sequence[Tuple[str, str, Sequence[str]]]):
+        """
+        Skill vocabulary with canonical IDs and aliases
+
+        Args:
+            skills: (skill_id, canonical name, aliases) tuples; names and
+                aliases are matched case-insensitively
+        """
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        # Every matchable phrase (name or alias), lowercased, and the skill it maps to
+        self.terms: List[str] = []
+        self.term_skill: List[int] = []
+
+        seen = set()
+        for skill_id, name, aliases in skills:
+            skill = len(self.ids)
+            self.ids.append(str(skill_id))
+            self.names.append(name.strip().lower())
+            for phrase in [name, *aliases]:
+                phrase = " ".join(phrase.lower().split())
+                # A phrase shared by several skills keeps its first owner
+                if phrase and phrase not in seen:
+                    seen.add(phrase)
+                    self.terms.append(phrase)
+                    self.term_skill.append(skill)
+
+        digest = hashlib.sha1()
+        for skill_id, name in zip(self.ids, self.names):
+            digest.update(f"{skill_id}\t{name}\n".encode("utf-8"))
+        for term, skill in zip(self.terms, self.term_skill):
+            digest.update(f"{term}\t{skill}\n".encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+        self.trie: Optional[Dict] = None
+        self.max_phrase_tokens = 0
+        self._build_fuzzy_index()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_skills(cls, skills: Iterable[str]) -> "SkillTaxonomy":
+        """Taxonomy where each skill is its own ID with no aliases"""
+        names = list(dict.fromkeys(skill.lower() for skill in skills))
+        return cls([(name, name, ()) for name in names])
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTaxonomy":
+        """
+        Load a taxonomy from a JSON or CSV file
+
+        JSON files hold a list of {"id", "name", "aliases"} objects (or a
+        mapping of name to aliases). CSV files have id, name and aliases
+        columns, with aliases separated by '|'.
+        """
+        if path.endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = [
+                    (row.get("id") or row["name"], row["name"],
+                     [alias for alias in (row.get("aliases") or "").split("|") if alias.strip()])
+                    for row in csv.DictReader(f)
+                ]
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                rows = [(name, name, aliases) for name, aliases in data.items()]
+            else:
+                rows = [(item.get("id") or item["name"], item["name"], item.get("aliases", [])) for item in data]
+        return cls(rows)
+
+    def compile(self, tokenize: Callable[[str], List[str]]):
+        """
+        Build the token trie used by match()
+
+        Phrases are split with the same tokenizer that is applied to
+        documents, so multi-token skills line up with document tokens.
+
+        Args:
+            tokenize: Function returning the token strings of a phrase
+        """
+        trie: Dict = {}
+        max_tokens = 0
+        for term_id, term in enumerate(self.terms):
+            tokens = tokenize(term)
+            if not tokens:
+                continue
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, self.term_skill[term_id])
+            max_tokens = max(max_tokens, len(tokens))
+        self.trie = trie
+        self.max_phrase_tokens = max_tokens
+
+    def match(self, tokens: Sequence[str]) -> List[str]:
+        """
+        Canonical names of every skill phrase occurring in a token sequence
+
+        Walks the trie from each token, so the cost is linear in document
+        length (times the longest phrase) regardless of taxonomy size.
+        Overlapping matches are all reported, like spaCy's PhraseMatcher.
+        """
+        if self.trie is None:
+            raise RuntimeError("SkillTaxonomy.compile() must be called before match()")
+        found = []
+        trie = self.trie
+        for start in range(len(tokens)):
+            node = trie.get(tokens[start])
+            end = start + 1
+            while node is not None:
+                skill = node.get(_END)
+                if skill is not None:
+                    found.append(self.names[skill])
+                if end == len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+        return found
+
+    def _build_fuzzy_index(self):
+        # Terms of two characters or fewer are dropped in cleanup, so don't fuzzy-match them
+        self.fuzzy_terms = [i for i, term in enumerate(self.terms) if len(term) > 2]
+        self._fuzzy_strings = [self.terms[i] for i in self.fuzzy_terms]
+        self._trigram_postings: Dict[str, np.ndarray] = {}
+        self._term_lengths = None
+        if len(self.fuzzy_terms) <= FUZZY_FULL_SCAN_LIMIT:
+            return
+
+        lengths = np.array([len(term) for term in self._fuzzy_strings], dtype=np.int32)
+        postings = defaultdict(list)
+        # Visit terms shortest first so every posting list is ordered by term length
+        for position in np.argsort(lengths, kind="stable").tolist():
+            for gram in _trigrams(self._fuzzy_strings[position]):
+                postings[gram].append(position)
+        self._trigram_postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._term_lengths = lengths
+
+    def _fuzzy_candidates(self, token: str) -> np.ndarray:
+        """
+        Positions in fuzzy_terms worth scoring against a token, at most
+        FUZZY_MAX_CANDIDATES of them
+
+        Terms are ranked by the number of trigrams they share with the
+        token, then by how close their length is. Posting lists longer than
+        FUZZY_MAX_POSTINGS are cut to the entries nearest the token's
+        length, so the work per token is bounded whatever the taxonomy size.
+        """
+        lengths = self._term_lengths
+        hits = []
+        for gram in _trigrams(token):
+            posting = self._trigram_postings.get(gram)
+            if posting is None:
+                continue
+            if len(posting) > FUZZY_MAX_POSTINGS:
+                middle = int(np.searchsorted(lengths[posting], len(token)))
+                first = min(max(0, middle - FUZZY_MAX_POSTINGS // 2), len(posting) - FUZZY_MAX_POSTINGS)
+                posting = posting[first:first + FUZZY_MAX_POSTINGS]
+            hits.append(posting)
+        if not hits:
+            return np.empty(0, dtype=np.int32)
+
+        positions, shared = np.unique(np.concatenate(hits), return_counts=True)
+        if len(positions) <= FUZZY_MAX_CANDIDATES:
+            return positions
+        distance = np.abs(lengths[positions] - len(token))
+        order = np.lexsort((distance, -shared))
+        return positions[order[:FUZZY_MAX_CANDIDATES]]
+
+    def fuzzy_match(self, tokens: List[str], threshold: float) -> List[str]:
+        """
+        Canonical names of skills with a term scoring above threshold
+        (fuzz.partial_ratio) against any token
+
+        Small taxonomies score every (term, unique token) pair in one
+        batched rapidfuzz call. Larger ones score each token only against
+        its _fuzzy_candidates(), so matching cost depends on the number of
+        tokens, not the taxonomy size. That is approximate: a term sharing
+        no trigram with a token, or outranked by closer candidates, is not
+        scored.
+        """
+        unique_tokens = list(dict.fromkeys(tokens))
+        if not unique_tokens or not self.fuzzy_terms:
+            return []
+
+        if self._term_lengths is None:
+            scores = process.cdist(
+                self._fuzzy_strings,
+                unique_tokens,
+                scorer=fuzz.partial_ratio,
+                score_cutoff=threshold,
+                dtype=np.float64,
+                workers=-1
+            )
+            matched = np.flatnonzero((scores > threshold).any(axis=1))
+        else:
+            pair_positions, pair_tokens = [], []
+            for token in unique_tokens:
+                positions = self._fuzzy_candidates(token)
+                pair_positions.append(positions)
+                pair_tokens.extend([token] * len(positions))
+            if not pair_tokens:
+                return []
+            positions = np.concatenate(pair_positions)
+            scores = process.cpdist(
+                [self._fuzzy_strings[p] for p in positions],
+                pair_tokens,
+                scorer=fuzz.partial_ratio,
+                score_cutoff=threshold,
+                dtype=np.float64
+            )
+            matched = np.unique(positions[scores > threshold])
+        skills = dict.fromkeys(self.term_skill[self.fuzzy_terms[p]] for p in matched.tolist())
+        return [self.names[skill] for skill in skills]
+
+    def save(self, path: str):
+        """Write the compiled taxonomy to disk, atomically"""
+        if self.trie is None:
+            raise RuntimeError("SkillTaxonomy.compile() must be called before save()")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"format": COMPILED_FORMAT, "taxonomy": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> Optional["SkillTaxonomy"]:
+        """Read a compiled taxonomy, or None if the file is missing or outdated"""
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if not isinstance(data, dict) or data.get("format") != COMPILED_FORMAT:
+            return None
+        return data["taxonomy"]
+
+
+def compiled_path(taxonomy_path: str) -> str:
+    """Where the compiled form of a taxonomy file is cached"""
+    return f"{taxonomy_path}.compiled.pkl"
+
+
+def load_taxonomy(
+    path: Optional[str],
+    tokenize: Callable[[str], List[str]],
+    default_skills: Iterable[str] = ()
+) -> SkillTaxonomy:
+    """
+    Load and compile a skill taxonomy, reusing a compiled copy when fresh
+
+    Args:
+        path: Taxonomy JSON/CSV file; None uses default_skills
+        tokenize: Function returning the token strings of a phrase
+        default_skills: Skill names used when no taxonomy file is configured
+
+    Returns:
+        Compiled SkillTaxonomy
+    """
+    if not path:
+        taxonomy = SkillTaxonomy.from_skills(default_skills)
+        taxonomy.compile(tokenize)
+        return taxonomy
+
+    cache_path = compiled_path(path)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        taxonomy = SkillTaxonomy.load(cache_path)
+        if taxonomy is not None:
+            print(f"Loaded compiled skill taxonomy from {cache_path} ({len(taxonomy)} skills)")
+            return taxonomy
+
+    taxonomy = SkillTaxonomy.from_file(path)
+    taxonomy.compile(tokenize)
+    try:
+        taxonomy.save(cache_path)
+    except OSError as e:
+        # Read-only deployments still work, they just compile on every start
+        print(f"Could not write compiled skill taxonomy to {cache_path}: {e}")
+    print(f"Compiled skill taxonomy from {path} ({len(taxonomy)} skills, {len(taxonomy.terms)} phrases)")
+    return taxonomy
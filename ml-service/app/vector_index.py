@@ -0,0 +1,524 @@
+import os
+import numpy as np
+from typing import List, Optional, Tuple
+
+# Files written by IVFIndex.save alongside the binary catalog
+IVF_CENTROIDS_FILE = "ivf_centroids.npy"
+IVF_ASSIGNMENTS_FILE = "ivf_assignments.npy"
+# Files written by QuantizedIndex.save; {} is the precision
+QUANTIZED_FILE = "course_embeddings.{}.npy"
+QUANTIZED_SCALES_FILE = "course_embeddings.int8-scales.npy"
+
+# Compact storage precisions of QuantizedIndex. float16 isn't offered: NumPy
+# has no float16 matrix product, so its scans were several times slower than
+# float32 while saving less memory than int8.
+PRECISIONS = ("int8",)
+
+
+def is_memory_mapped(array: np.ndarray) -> bool:
+    """Check whether an array (or the array it is a view of) is backed by a memory-mapped file"""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Positions of the top_k highest scores, best first, ties in position order"""
+    n = scores.shape[0]
+    top_k = min(max(int(top_k), 0), n)
+    if top_k == 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < n:
+        # Keep candidates in row order so ties resolve like a stable sort
+        candidates = np.sort(np.argpartition(-scores, top_k - 1)[:top_k])
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order]
+
+
+def _cluster_sums(points: np.ndarray, labels: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Sum of the points in each cluster, as segment sums over the label-sorted points"""
+    order = np.argsort(labels, kind="stable")
+    counts = np.bincount(labels, minlength=n_clusters)
+    present = np.flatnonzero(counts)
+    starts = (np.cumsum(counts) - counts)[present]
+    sums = np.zeros((n_clusters, points.shape[1]), dtype=np.float32)
+    sums[present] = np.add.reduceat(points[order], starts, axis=0)
+    return sums
+
+
+class VectorIndex:
+    def __init__(self, embeddings: np.ndarray, normalized: bool = False):
+        """
+        Build an in-memory cosine similarity index over course embeddings
+
+        The embeddings are stored once as a contiguous, L2-normalized float32
+        matrix so that a query is a single matrix-vector product. This is the
+        exact (brute-force) search backend; other backends subclass it and
+        override search().
+
+        Args:
+            embeddings: 2D array of shape (n_courses, dim)
+            normalized: Rows are already unit-length float32; use them without
+                copying (e.g. a memory-mapped catalog)
+        """
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2D embedding matrix, got shape {matrix.shape}")
+
+        if not normalized:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        self.embeddings = matrix
+        self.embeddings.setflags(write=False)
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.embeddings.shape[1]
+
+    def memory_bytes(self) -> int:
+        """Bytes of index data held in memory; the scanned matrix counts even when memory-mapped"""
+        return self.embeddings.nbytes
+
+    @staticmethod
+    def normalize_query(query: np.ndarray) -> np.ndarray:
+        """Convert a query embedding to a unit-length float32 vector"""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the courses most similar to a query embedding
+
+        Args:
+            query: Query embedding of shape (dim,)
+            top_k: Number of results to return
+            mask: Optional boolean array; only courses where it is True are returned
+
+        Returns:
+            Tuple of (row indices, cosine similarities), best match first
+        """
+        if len(self) == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = self.normalize_query(query)
+        if mask is None:
+            scores = self.embeddings @ query
+            indices = top_k_indices(scores, top_k)
+            return indices, scores[indices]
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) * 2 < len(self):
+            # Selective filter: only score the matching rows
+            scores = self.embeddings[candidates] @ query
+        else:
+            scores = (self.embeddings @ query)[candidates]
+        best = top_k_indices(scores, top_k)
+        return candidates[best], scores[best]
+
+    def search_many(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Search for several queries with a single matrix product
+
+        Args:
+            queries: Query embeddings of shape (n_queries, dim)
+            top_k: Number of results per query
+            mask: Optional boolean array; only courses where it is True are returned
+
+        Returns:
+            One (row indices, cosine similarities) tuple per query
+        """
+        queries = self._normalize_queries(queries)
+        if len(self) == 0 or top_k <= 0 or len(queries) == 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in queries]
+
+        # (n_queries, n_candidates) scores in one product
+        candidates = None if mask is None else np.flatnonzero(mask)
+        if candidates is None:
+            scores = queries @ self.embeddings.T
+        elif len(candidates) * 2 < len(self):
+            # Selective filter: only score the matching rows
+            scores = queries @ self.embeddings[candidates].T
+        else:
+            scores = (queries @ self.embeddings.T)[:, candidates]
+        results = []
+        for row in scores:
+            best = top_k_indices(row, top_k)
+            results.append((best if candidates is None else candidates[best], row[best]))
+        return results
+
+    @staticmethod
+    def _normalize_queries(queries: np.ndarray) -> np.ndarray:
+        """Convert query embeddings to unit-length float32 rows"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return queries / norms
+
+
+class IVFIndex(VectorIndex):
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        normalized: bool = False,
+        n_lists: int = 0,
+        n_probe: int = 8,
+        centroids: Optional[np.ndarray] = None,
+        assignments: Optional[np.ndarray] = None,
+        seed: int = 0
+    ):
+        """
+        Approximate nearest-neighbour index using an inverted file (IVF)
+
+        Courses are clustered with spherical k-means. A query only scans the
+        courses in the n_probe clusters whose centroids are closest to it.
+
+        Args:
+            embeddings: 2D array of shape (n_courses, dim)
+            normalized: Rows are already unit-length float32
+            n_lists: Number of clusters; 0 picks about 4 * sqrt(n_courses)
+            n_probe: Number of clusters scanned per query
+            centroids: Pre-trained centroids (e.g. from IVFIndex.load_clusters)
+            assignments: Pre-computed cluster of each course
+            seed: Random seed for k-means initialization
+        """
+        super().__init__(embeddings, normalized=normalized)
+        n = len(self)
+
+        if centroids is None or assignments is None:
+            if n_lists <= 0:
+                n_lists = int(round(4 * np.sqrt(n)))
+            n_lists = max(1, min(n_lists, n))
+            centroids = self._train(n_lists, seed)
+            assignments = self._assign(centroids)
+
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.assignments = np.asarray(assignments, dtype=np.int64)
+        self.n_probe = max(1, n_probe)
+
+        # Inverted lists in CSR form: list_ids[offsets[c]:offsets[c + 1]] are the courses in cluster c.
+        # Probed rows are gathered from self.embeddings, so a memory-mapped matrix stays shared
+        self.list_ids = np.argsort(self.assignments, kind="stable")
+        counts = np.bincount(self.assignments, minlength=len(self.centroids))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def memory_bytes(self) -> int:
+        """Bytes of index data held in memory; the embeddings count unless memory-mapped"""
+        extra = self.centroids.nbytes + self.assignments.nbytes + self.list_ids.nbytes + self.offsets.nbytes
+        return extra + (0 if is_memory_mapped(self.embeddings) else self.embeddings.nbytes)
+
+    def _train(
+        self,
+        n_lists: int,
+        seed: int,
+        iterations: int = 15,
+        max_samples: int = 50000,
+        tolerance: float = 0.001
+    ) -> np.ndarray:
+        """
+        Spherical k-means over (a sample of) the embeddings
+
+        Stops early once fewer than tolerance of the sampled rows change cluster.
+        """
+        rng = np.random.default_rng(seed)
+        n = len(self)
+        sample = self.embeddings
+        if n > max_samples:
+            sample = self.embeddings[np.sort(rng.choice(n, max_samples, replace=False))]
+
+        centroids = sample[rng.choice(sample.shape[0], n_lists, replace=False)].copy()
+        labels = None
+        for _ in range(iterations):
+            previous, labels = labels, np.argmax(sample @ centroids.T, axis=1)
+            if previous is not None and np.count_nonzero(labels != previous) <= tolerance * len(labels):
+                break
+            sums = _cluster_sums(sample, labels, n_lists)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty clusters with random points
+            sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = sums / norms
+        return centroids.astype(np.float32)
+
+    def _assign(self, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Assign every course to its closest centroid"""
+        assignments = np.empty(len(self), dtype=np.int64)
+        for start in range(0, len(self), chunk_size):
+            chunk = self.embeddings[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the most similar courses to a query embedding
+
+        The mask is applied inside the probed clusters. Falls back to an
+        exact scan when they hold fewer than top_k matching courses.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = self.normalize_query(query)
+        probes = top_k_indices(self.centroids @ query, self.n_probe)
+        positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+        if mask is not None:
+            positions = positions[mask[self.list_ids[positions]]]
+        if len(positions) < top_k:
+            return super().search(query, top_k, mask=mask)
+
+        ids = self.list_ids[positions]
+        scores = self.embeddings[ids] @ query
+        best = top_k_indices(scores, top_k)
+        return ids[best], scores[best]
+
+    def search_many(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Search for several queries; each probes its own clusters"""
+        return [self.search(query, top_k, mask=mask) for query in self._normalize_queries(queries)]
+
+    def save(self, directory: str):
+        """Write the trained clusters so the index can be loaded without retraining"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, IVF_CENTROIDS_FILE), self.centroids)
+        np.save(os.path.join(directory, IVF_ASSIGNMENTS_FILE), self.assignments)
+
+    @staticmethod
+    def load_clusters(directory: str, n_courses: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Read clusters written by save(), or None if missing or built for another catalog"""
+        centroids_path = os.path.join(directory, IVF_CENTROIDS_FILE)
+        assignments_path = os.path.join(directory, IVF_ASSIGNMENTS_FILE)
+        if not (os.path.exists(centroids_path) and os.path.exists(assignments_path)):
+            return None
+        assignments = np.load(assignments_path)
+        if assignments.shape[0] != n_courses:
+            return None
+        return np.load(centroids_path), assignments
+
+
+class QuantizedIndex(VectorIndex):
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        normalized: bool = False,
+        precision: str = "int8",
+        rerank_factor: int = 4,
+        compact: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+        chunk_size: int = 256
+    ):
+        """
+        Exact-ranking index that scans a compact copy of the embeddings
+
+        Every course is scored with an int8 matrix (one scale per
+        dimension), then the top_k * rerank_factor best candidates are
+        re-scored with the float32 matrix. Only when that matrix is memory-
+        mapped (the binary catalog) are just the shortlisted rows read, so a
+        worker keeps little more than the compact matrix in memory. An
+        in-memory float32 matrix stays resident next to the compact one.
+
+        This saves memory, not scan time. Measured at 100k x 384 on one
+        core: exact search takes about 20 ms per query and touches the whole
+        154 MB float32 matrix; the int8 scan takes 18-20 ms (NumPy has no
+        int8 matrix product, so converting chunks to float32 costs what the
+        smaller reads save) and touches 38 MB plus the re-ranked rows. With
+        an in-memory float32 matrix the index holds 192 MB, more than exact
+        search, so the service only uses it with the memory-mapped catalog.
+
+        Args:
+            embeddings: 2D array of shape (n_courses, dim)
+            normalized: Rows are already unit-length float32
+            precision: Compact storage, one of PRECISIONS
+            rerank_factor: Shortlist size as a multiple of top_k
+            compact: Pre-built compact matrix (e.g. from QuantizedIndex.load_compact)
+            scales: Per-dimension scales belonging to compact
+            chunk_size: Rows converted to float32 at a time while scanning;
+                small chunks stay in CPU cache between conversion and product
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        super().__init__(embeddings, normalized=normalized)
+        self.precision = precision
+        self.rerank_factor = max(1, rerank_factor)
+        self.chunk_size = max(1, chunk_size)
+
+        if compact is None:
+            compact, scales = self.quantize(self.embeddings, precision)
+        self.compact = compact
+        self.scales = scales
+
+    @staticmethod
+    def quantize(embeddings: np.ndarray, precision: str, chunk_size: int = 65536) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Convert normalized float32 embeddings to the compact precision
+
+        Returns:
+            Tuple of (compact matrix, per-dimension scales)
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+
+        # Symmetric per-dimension scale: the largest magnitude in each dimension maps to 127
+        scales = np.zeros(embeddings.shape[1], dtype=np.float32)
+        for start in range(0, embeddings.shape[0], chunk_size):
+            scales = np.maximum(scales, np.abs(embeddings[start:start + chunk_size]).max(axis=0))
+        scales = np.where(scales > 0, scales / 127.0, 1.0).astype(np.float32)
+
+        compact = np.empty(embeddings.shape, dtype=np.int8)
+        for start in range(0, embeddings.shape[0], chunk_size):
+            chunk = embeddings[start:start + chunk_size] / scales
+            compact[start:start + chunk_size] = np.clip(np.rint(chunk), -127, 127)
+        return compact, scales
+
+    def _approximate_scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score rows (default: all) with the compact matrix"""
+        # Folding the int8 scales into the query scores rows without dequantizing them
+        query = query * self.scales
+        if rows is not None:
+            return self.compact[rows].astype(np.float32) @ query
+
+        # NumPy has no int8 matrix product; convert bounded chunks to float32
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), self.chunk_size):
+            chunk = self.compact[start:start + self.chunk_size].astype(np.float32)
+            scores[start:start + self.chunk_size] = chunk @ query
+        return scores
+
+    def _rerank(self, query: np.ndarray, shortlist: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-score a shortlist at full precision"""
+        # Re-rank in row order so ties resolve like exact search
+        shortlist = np.sort(shortlist)
+        exact_scores = self.embeddings[shortlist] @ query
+        best = top_k_indices(exact_scores, top_k)
+        return shortlist[best], exact_scores[best]
+
+    def search_many(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Scan the compact matrix once for all queries, then re-rank each shortlist"""
+        queries = self._normalize_queries(queries)
+        if len(self) == 0 or top_k <= 0 or len(queries) == 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in queries]
+
+        scaled = queries * self.scales
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        scores = np.empty((len(queries), len(rows)), dtype=np.float32)
+        for start in range(0, len(rows), self.chunk_size):
+            chunk_rows = rows[start:start + self.chunk_size]
+            chunk = self.compact[chunk_rows[0]:chunk_rows[-1] + 1] if mask is None else self.compact[chunk_rows]
+            scores[:, start:start + len(chunk_rows)] = scaled @ chunk.astype(np.float32).T
+
+        shortlist_size = top_k * self.rerank_factor
+        return [
+            self._rerank(query, rows[top_k_indices(row, shortlist_size)], top_k)
+            for query, row in zip(queries, scores)
+        ]
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the courses most similar to a query embedding
+
+        Candidates come from the compact scan; their returned scores are
+        exact float32 cosine similarities.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = self.normalize_query(query)
+        shortlist_size = top_k * self.rerank_factor
+        if mask is None:
+            shortlist = top_k_indices(self._approximate_scores(query), shortlist_size)
+        else:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) * 2 < len(self):
+                # Selective filter: only score the matching rows
+                scores = self._approximate_scores(query, candidates)
+            else:
+                scores = self._approximate_scores(query)[candidates]
+            shortlist = candidates[top_k_indices(scores, shortlist_size)]
+        return self._rerank(query, shortlist, top_k)
+
+    def save(self, directory: str):
+        """Write the compact matrix so it can be memory-mapped instead of rebuilt"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, QUANTIZED_FILE.format(self.precision)), self.compact)
+        np.save(os.path.join(directory, QUANTIZED_SCALES_FILE), self.scales)
+
+    def memory_bytes(self) -> int:
+        """Bytes held in memory: the compact matrix, plus the float32 one unless it is memory-mapped"""
+        compact = self.compact.nbytes + self.scales.nbytes
+        return compact + (0 if is_memory_mapped(self.embeddings) else self.embeddings.nbytes)
+
+    @staticmethod
+    def load_compact(directory: str, precision: str, n_courses: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Memory-map a compact matrix written by save(), or None if missing or built for another catalog"""
+        compact_path = os.path.join(directory, QUANTIZED_FILE.format(precision))
+        scales_path = os.path.join(directory, QUANTIZED_SCALES_FILE)
+        if not (os.path.exists(compact_path) and os.path.exists(scales_path)):
+            return None
+        compact = np.load(compact_path, mmap_mode='r')
+        if compact.shape[0] != n_courses:
+            return None
+        return compact, np.load(scales_path)
+
+
+SEARCH_BACKENDS = {
+    "exact": VectorIndex,
+    "ivf": IVFIndex,
+    "quantized": QuantizedIndex,
+}
+
+
+def build_index(embeddings: np.ndarray, backend: str = "exact", normalized: bool = False, **options) -> VectorIndex:
+    """
+    Build a search index using the named backend
+
+    Args:
+        embeddings: 2D array of shape (n_courses, dim)
+        backend: One of SEARCH_BACKENDS
+        normalized: Rows are already unit-length float32
+        options: Backend-specific options (e.g. n_lists, n_probe for "ivf",
+            precision, rerank_factor for "quantized")
+    """
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown search backend '{backend}', expected one of {list(SEARCH_BACKENDS)}")
+    return SEARCH_BACKENDS[backend](embeddings, normalized=normalized, **options)
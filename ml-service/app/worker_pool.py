@@ -0,0 +1,135 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a worker pool already has its maximum number of queued tasks"""
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        name: str,
+        executor: Executor,
+        max_workers: int,
+        max_queue_depth: int,
+        executor_factory: Optional[Callable[[], Executor]] = None
+    ):
+        """
+        Run blocking work on an executor with a bounded number of pending tasks
+
+        Args:
+            name: Pool name used in error messages and stats
+            executor: Executor that runs the tasks
+            max_workers: Number of workers in the executor
+            max_queue_depth: Maximum number of running plus queued tasks
+            executor_factory: Creates a replacement executor for recycle()
+        """
+        self.name = name
+        self.executor = executor
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.executor_factory = executor_factory
+        self.recycled = 0
+        self._pending = 0
+        # Threads see the caller's context variables (request metrics); processes can't
+        self._copy_context = isinstance(executor, ThreadPoolExecutor)
+
+    @classmethod
+    def threads(cls, name: str, max_workers: int, max_queue_depth: int) -> "WorkerPool":
+        """Create a thread-backed pool for work that releases the GIL (spaCy, torch)"""
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return cls(name, executor, max_workers, max_queue_depth)
+
+    @classmethod
+    def processes(cls, name: str, max_workers: int, max_queue_depth: int) -> "WorkerPool":
+        """Create a process-backed pool for pure-Python CPU work (PDF parsing)"""
+        def make_executor() -> Executor:
+            # Spawn rather than fork: the parent holds torch and executor threads
+            return ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return cls(name, make_executor(), max_workers, max_queue_depth, executor_factory=make_executor)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit a function to the pool without waiting for it
+
+        The task counts as pending until the executor has actually finished
+        it (or dropped it), not just until its caller stops waiting, so an
+        abandoned task that is still running keeps occupying the queue.
+
+        Must be called from the event loop thread.
+
+        Raises:
+            PoolSaturatedError: If the pool is already at its queue depth
+        """
+        if self._pending >= self.max_queue_depth:
+            raise PoolSaturatedError(f"{self.name} pool is saturated ({self._pending} pending tasks)")
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        if self._copy_context:
+            call = functools.partial(contextvars.copy_context().run, call)
+        future = self.executor.submit(call)
+        self._pending += 1
+        future.add_done_callback(lambda _: self._call_in_loop(loop, self._task_done))
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a function on the pool and wait for its result
+
+        Cancelling the wait drops the task if it has not started yet.
+
+        Raises:
+            PoolSaturatedError: If the pool is already at its queue depth
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def recycle(self):
+        """
+        Replace the executor, terminating the worker processes of the old one
+
+        Used when a task overruns its time limit: a thread can't be stopped,
+        but a stuck worker process can. Tasks still queued or running on the
+        old executor fail with BrokenProcessPool, which releases their
+        pending slots.
+        """
+        if self.executor_factory is None:
+            raise RuntimeError(f"{self.name} pool can't be recycled")
+        old, self.executor = self.executor, self.executor_factory()
+        self.recycled += 1
+        # ProcessPoolExecutor has no public way to stop a running task
+        processes = list((getattr(old, "_processes", None) or {}).values())
+        for process in processes:
+            process.terminate()
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def _task_done(self):
+        self._pending -= 1
+
+    @staticmethod
+    def _call_in_loop(loop: asyncio.AbstractEventLoop, callback: Callable):
+        """Run callback on the event loop thread; executor callbacks fire on worker threads"""
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # The loop is closed (shutdown); nothing reads the count any more
+            pass
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_queue_depth": self.max_queue_depth,
+            "recycled": self.recycled
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
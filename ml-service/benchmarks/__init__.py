@@ -0,0 +1 @@
+# ML Service Benchmarks
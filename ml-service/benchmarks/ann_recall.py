@@ -0,0 +1,90 @@
+"""
+Recall@k and latency of the IVF search backend against exact search
+
+Runs on the real course catalog (if present) and on synthetic clustered
+catalogs of increasing size, and prints the results as JSON.
+
+Usage:
+    python -m benchmarks.ann_recall [--scales 10000 100000] [--top-k 10] [--probes 4 8 16]
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from app import catalog_store
+from app.vector_index import IVFIndex, VectorIndex
+from .synthetic import synthetic_embeddings
+
+
+def load_catalog_embeddings(data_path: str) -> np.ndarray:
+    store_dir = catalog_store.current_version(catalog_store.store_path(data_path))
+    if store_dir is not None:
+        return np.asarray(catalog_store.read_catalog_store(store_dir)[1])
+    courses_df = catalog_store.read_course_data(data_path)
+    return np.vstack(courses_df['Embeddings skills'].values)
+
+
+def measure_recall(name: str, embeddings: np.ndarray, queries: np.ndarray, top_k: int, probes) -> dict:
+    """Compare IVF results to exact search for each n_probe setting"""
+    exact = VectorIndex(embeddings)
+    start = time.perf_counter()
+    ivf = IVFIndex(exact.embeddings, normalized=True)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = [set(exact.search(query, top_k)[0].tolist()) for query in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    result = {
+        "catalog": name,
+        "courses": len(exact),
+        "n_lists": ivf.n_lists,
+        "ivf_build_seconds": round(build_seconds, 3),
+        "exact_ms_per_query": round(exact_ms, 3),
+        "ivf": []
+    }
+    for n_probe in probes:
+        ivf.n_probe = n_probe
+        start = time.perf_counter()
+        found = [set(ivf.search(query, top_k)[0].tolist()) for query in queries]
+        ivf_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([len(a & b) / max(1, len(a)) for a, b in zip(truth, found)])
+        result["ivf"].append({
+            "n_probe": n_probe,
+            f"recall@{top_k}": round(float(recall), 4),
+            "ms_per_query": round(ivf_ms, 3)
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure IVF recall@k against exact search")
+    parser.add_argument("--data-path", default="./data", help="Directory containing the course data files")
+    parser.add_argument("--scales", type=int, nargs="*", default=[10000, 100000], help="Synthetic catalog sizes")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    results = []
+
+    if os.path.isdir(args.data_path):
+        embeddings = load_catalog_embeddings(args.data_path)
+        # Perturbed catalog rows stand in for real skill queries
+        queries = embeddings[rng.integers(0, len(embeddings), args.queries)]
+        queries = queries + 0.3 * rng.normal(size=queries.shape).astype(np.float32)
+        results.append(measure_recall("coursera", embeddings, queries, args.top_k, args.probes))
+
+    for n in args.scales:
+        embeddings = synthetic_embeddings(n)
+        queries = synthetic_embeddings(args.queries, seed=1)
+        results.append(measure_recall(f"synthetic-{n}", embeddings, queries, args.top_k, args.probes))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+In-process load test of the FastAPI app through an ASGI transport
+
+Starts the real services (spaCy, SentenceTransformer, course catalog),
+optionally swaps in a synthetic catalog of a given size, then drives each
+endpoint with a fixed number of concurrent clients. No network or server
+process is involved, so results measure the service itself.
+
+Usage:
+    python -m benchmarks.loadgen [--endpoints analyze-job search-courses]
+        [--concurrency 1 8 32] [--requests 200] [--words 500] [--courses 0]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+from app import main as service
+from app.course_catalog import CourseCatalog
+from .report import build_report, latency_summary, peak_rss_mb, write_report
+from .synthetic import synthetic_catalog, synthetic_skills, synthetic_text
+
+ENDPOINTS = ("extract-skills", "search-courses", "recommend-courses", "analyze-job", "analyze-jobs")
+# Job descriptions per /api/analyze-jobs request
+JOBS_PER_REQUEST = 20
+
+
+def _payloads(endpoint: str, count: int, words: int) -> List[Dict]:
+    """Distinct request bodies, so the result caches don't absorb the load"""
+    skills = synthetic_skills(200)
+    bodies = []
+    for i in range(count):
+        picked = [skills[(i * 7 + j) % len(skills)] for j in range(10)]
+        if endpoint == "extract-skills":
+            bodies.append({"text": synthetic_text(words, "resume", seed=i)})
+        elif endpoint == "search-courses":
+            bodies.append({"query": " ".join(picked[:2]), "top_n": 10})
+        elif endpoint == "recommend-courses":
+            bodies.append({"missing_skills": picked, "top_n": 10})
+        elif endpoint == "analyze-job":
+            bodies.append({
+                "job_description": synthetic_text(words, "job", seed=i),
+                "resume_skills": picked[:5],
+                "top_n": 10
+            })
+        elif endpoint == "analyze-jobs":
+            bodies.append({
+                "job_descriptions": [
+                    synthetic_text(words, "job", seed=i * JOBS_PER_REQUEST + j) for j in range(JOBS_PER_REQUEST)
+                ],
+                "resume_skills": picked[:5],
+                "top_n": 10
+            })
+        else:
+            raise ValueError(f"Unknown endpoint '{endpoint}'")
+    return bodies
+
+
+async def run_load(client: httpx.AsyncClient, path: str, bodies: List[Dict], concurrency: int) -> Dict:
+    """Send every body with at most concurrency requests in flight"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    next_body = iter(bodies)
+
+    async def worker():
+        for body in next_body:
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            elapsed = time.perf_counter() - start
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = latency_summary(latencies, time.perf_counter() - start)
+    summary["status_counts"] = {str(status): count for status, count in sorted(statuses.items())}
+    return summary
+
+
+async def run_suite(
+    endpoints: List[str],
+    concurrency_levels: List[int],
+    requests: int,
+    words: int,
+    courses: int,
+    log: Callable[[str], None]
+) -> List[Dict]:
+    await service.startup_event()
+    try:
+        if courses:
+            recommender = service.course_recommender
+            courses_df, embeddings = synthetic_catalog(
+                courses, dim=recommender.model.get_sentence_embedding_dimension()
+            )
+            recommender._set_catalog(CourseCatalog(courses_df, embeddings=embeddings))
+        catalog_size = len(service.course_recommender.catalog)
+
+        transport = httpx.ASGITransport(app=service.app)
+        results = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for endpoint in endpoints:
+                path = f"/api/{endpoint}"
+                # Warm up lazy initialization outside the measurement
+                for body in _payloads(endpoint, 2, words):
+                    await client.post(path, json=body)
+                for concurrency in concurrency_levels:
+                    bodies = _payloads(endpoint, requests, words)
+                    summary = await run_load(client, path, bodies, concurrency)
+                    params = {"concurrency": concurrency, "words": words, "courses": catalog_size}
+                    results.append({"name": endpoint, "params": params, **summary, "peak_rss_mb": peak_rss_mb()})
+                    log(f"{endpoint} {params}: {summary['throughput_per_s']}/s p95={summary['p95_ms']}ms")
+        return results
+    finally:
+        await service.shutdown_event()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the ML service in-process")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--words", type=int, default=500, help="Words per synthetic resume/job description")
+    parser.add_argument("--courses", type=int, default=0, help="Synthetic catalog size (0 keeps the real catalog)")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="Report of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(
+        args.endpoints,
+        args.concurrency,
+        args.requests,
+        args.words,
+        args.courses,
+        log=lambda line: print(line, file=sys.stderr)
+    ))
+    report = build_report("loadgen", results, args.baseline, args.tolerance)
+    write_report(report, args.output)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Latency statistics, resource usage and baseline comparison for benchmark results
+"""
+import json
+import platform
+import resource
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Result fields compared against the baseline, and which direction is better
+_LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms")
+_HIGHER_IS_BETTER = ("throughput_per_s",)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def latency_summary(latencies: List[float], elapsed: float, items: Optional[int] = None) -> Dict:
+    """
+    Summarize per-call latencies in seconds
+
+    Args:
+        latencies: Duration of each call
+        elapsed: Wall-clock time of the whole run, for throughput
+        items: Units of work processed (defaults to the number of calls)
+    """
+    samples = np.asarray(latencies, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if len(samples) else (0.0, 0.0, 0.0)
+    return {
+        "calls": len(samples),
+        "mean_ms": round(float(samples.mean()), 3) if len(samples) else 0.0,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "throughput_per_s": round((items if items is not None else len(samples)) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 2, items_per_call: int = 1) -> Dict:
+    """Call fn repeatedly and summarize its latency"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_start)
+    return latency_summary(latencies, time.perf_counter() - start, items=repeat * items_per_call)
+
+
+def result_key(result: Dict) -> str:
+    """Identify a benchmark case by its name and parameters"""
+    params = ",".join(f"{name}={value}" for name, value in sorted(result.get("params", {}).items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare_to_baseline(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    """
+    Find cases that got worse than the baseline by more than tolerance
+
+    Args:
+        results: Current benchmark results
+        baseline: Results of a previous run
+        tolerance: Allowed relative slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        One entry per regressed metric
+    """
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+        for field in _LOWER_IS_BETTER + _HIGHER_IS_BETTER:
+            old, new = before.get(field), result.get(field)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if field in _HIGHER_IS_BETTER:
+                change = -change
+            result.setdefault("vs_baseline", {})[field] = round(change, 4)
+            if change > tolerance:
+                regressions.append({"case": result_key(result), "metric": field, "baseline": old, "current": new})
+    return regressions
+
+
+def build_report(suite: str, results: List[Dict], baseline_path: Optional[str] = None, tolerance: float = 0.2) -> Dict:
+    """Wrap results with environment details and the baseline comparison"""
+    report = {
+        "suite": suite,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        report["baseline"] = baseline_path
+        report["tolerance"] = tolerance
+        report["regressions"] = compare_to_baseline(results, baseline.get("results", []), tolerance)
+    return report
+
+
+def write_report(report: Dict, output: Optional[str]):
+    """Print the report as JSON and optionally save it (e.g. as the next baseline)"""
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,207 @@
+"""
+Micro-benchmarks for each stage of skill extraction and course recommendation
+
+Stages are grouped by what they need loaded:
+    text    - spaCy pipeline: extraction, phrase matching, fuzzy matching
+    catalog - synthetic catalogs only: similarity scan, filters, coverage, formatting
+    model   - SentenceTransformer: encoding, search_courses, recommend_courses
+
+Caches are disabled so every call does the full work. Results are printed
+as JSON and can be compared to a baseline from a previous run.
+
+Usage:
+    python -m benchmarks.stages [--groups text catalog model] [--sizes 100 500 2000]
+        [--scales 1000 10000 100000] [--repeat 50] [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.2]
+"""
+import argparse
+import contextlib
+import sys
+import tempfile
+from typing import Dict, List
+
+from app import catalog_store
+from app.course_catalog import CourseCatalog, CourseFilters
+from app.extraction_cache import ExtractionCache
+from app.query_cache import LRUCache
+from .report import build_report, peak_rss_mb, time_calls, write_report
+from .synthetic import TEXT_SIZES, synthetic_catalog, synthetic_embeddings, synthetic_skills, synthetic_texts
+
+GROUPS = ("text", "catalog", "model")
+CATALOG_SCALES = (1000, 10000, 100000)
+# Search backends compared by the catalog group, with their index options and
+# whether the float32 matrix is memory-mapped from a binary catalog, as in the service
+SCAN_BACKENDS = (
+    ("exact", {}, False),
+    ("ivf", {}, False),
+    ("quantized", {"precision": "int8"}, False),
+    ("quantized", {"precision": "int8"}, True),
+)
+
+
+def _result(name: str, params: Dict, summary: Dict) -> Dict:
+    result = {"name": name, "params": params, **summary, "peak_rss_mb": peak_rss_mb()}
+    print(f"{name} {params}: p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms", file=sys.stderr)
+    return result
+
+
+def _cycle(items: List):
+    """Return a function handing out items round-robin"""
+    position = [0]
+
+    def next_item():
+        item = items[position[0] % len(items)]
+        position[0] += 1
+        return item
+    return next_item
+
+
+def _topk_agreement(exact: CourseCatalog, other: CourseCatalog, queries, top_n: int) -> Dict:
+    """How often another backend returns the same top-n as exact search"""
+    same_order, recall = 0, 0.0
+    for query in queries:
+        expected = exact.search(query, top_n)[0].tolist()
+        found = other.search(query, top_n)[0].tolist()
+        same_order += expected == found
+        recall += len(set(expected) & set(found)) / max(1, len(expected))
+    return {"identical": round(same_order / len(queries), 4), f"recall@{top_n}": round(recall / len(queries), 4)}
+
+
+def bench_text(sizes, repeat: int) -> List[Dict]:
+    from app.skill_extractor import FUZZY_THRESHOLD, SkillExtractor
+
+    extractor = SkillExtractor()
+    extractor.cache = ExtractionCache(0, namespace="benchmark")
+    results = []
+    for size in sizes:
+        texts = synthetic_texts(32, size, seed=size)
+        next_text = _cycle(texts)
+        params = {"words": size, "profile": extractor.profile}
+
+        results.append(_result("extract_from_text", params, time_calls(
+            lambda: extractor.extract_from_text(next_text()), repeat
+        )))
+        results.append(_result("extract_many", {**params, "batch": len(texts)}, time_calls(
+            lambda: extractor.extract_many(texts), max(1, repeat // 10), items_per_call=len(texts)
+        )))
+
+        tokens = [[token.text for token in extractor.nlp.tokenizer(text.lower())] for text in texts]
+        next_tokens = _cycle(tokens)
+        results.append(_result("phrase_match", params, time_calls(
+            lambda: extractor.taxonomy.match(next_tokens()), repeat
+        )))
+        results.append(_result("fuzzy_match", params, time_calls(
+            lambda: extractor.taxonomy.fuzzy_match(next_tokens(), FUZZY_THRESHOLD), repeat
+        )))
+    return results
+
+
+def bench_catalog(scales, repeat: int, top_n: int = 10) -> List[Dict]:
+    results = []
+    queries = synthetic_embeddings(64, seed=1)
+    skill_queries = synthetic_embeddings(20, seed=2)
+    provider_filter = CourseFilters.create(provider="IBM")
+    for scale in scales:
+        courses_df, embeddings = synthetic_catalog(scale)
+        store_dir = tempfile.TemporaryDirectory(prefix="benchmark-catalog-")
+        # Keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            catalog_store.write_catalog_store(courses_df, store_dir.name, embeddings=embeddings)
+        mapped_df, mapped_embeddings = catalog_store.read_catalog_store(store_dir.name)
+        catalogs = {}
+        for backend, options, mapped in SCAN_BACKENDS:
+            if mapped:
+                catalog = CourseCatalog(
+                    mapped_df, embeddings=mapped_embeddings, normalized=True, backend=backend, index_options=options
+                )
+            else:
+                catalog = CourseCatalog(courses_df, embeddings=embeddings, backend=backend, index_options=options)
+            catalogs.setdefault(backend, catalog)
+            next_query = _cycle(list(queries))
+            params = {"courses": scale, "backend": backend, "top_n": top_n, "mapped": mapped, **options}
+
+            scan = time_calls(lambda: catalog.search(next_query(), top_n), repeat)
+            # Resident index memory: a memory-mapped float32 matrix only counts where it is scanned in full
+            scan["memory_mb"] = round(catalog.index.memory_bytes() / 2 ** 20, 1)
+            if backend != "exact":
+                scan["topk_agreement"] = _topk_agreement(catalogs["exact"], catalog, queries, top_n)
+            results.append(_result("similarity_scan", params, scan))
+            results.append(_result("filtered_scan", {**params, "filter": "provider"}, time_calls(
+                lambda: catalog.search(next_query(), top_n, filters=provider_filter), repeat
+            )))
+
+        catalog = catalogs["exact"]
+        results.append(_result("coverage_search", {"courses": scale, "skills": len(skill_queries), "top_n": top_n}, time_calls(
+            lambda: catalog.coverage_search(skill_queries, top_n), repeat
+        )))
+        indices, scores = catalog.search(queries[0], top_n)
+        results.append(_result("format_results", {"courses": scale, "top_n": top_n}, time_calls(
+            lambda: catalog.courses(indices, scores, detailed=True), repeat
+        )))
+        store_dir.cleanup()
+    return results
+
+
+def bench_model(scales, repeat: int, top_n: int = 10) -> List[Dict]:
+    from app.course_recommender import CourseRecommender
+
+    recommender = CourseRecommender()
+    recommender.embedding_cache = LRUCache(0)
+    recommender.result_cache = LRUCache(0)
+    results = []
+    try:
+        skills = synthetic_skills(64)
+        for batch in (1, 32):
+            batches = [skills[i:i + batch] for i in range(0, len(skills) - batch + 1, batch)]
+            next_batch = _cycle(batches)
+            results.append(_result("encode", {"batch": batch}, time_calls(
+                lambda: recommender.encoder.encode_many(next_batch()), repeat, items_per_call=batch
+            )))
+
+        next_skill = _cycle(skills)
+        for scale in scales:
+            courses_df, embeddings = synthetic_catalog(scale, dim=recommender.model.get_sentence_embedding_dimension())
+            recommender._set_catalog(CourseCatalog(courses_df, embeddings=embeddings))
+            params = {"courses": scale, "top_n": top_n}
+            results.append(_result("search_courses", params, time_calls(
+                lambda: recommender.search_courses(next_skill(), top_n=top_n), repeat
+            )))
+            for strategy in ("combined", "coverage"):
+                results.append(_result("recommend_courses", {**params, "skills": 20, "strategy": strategy}, time_calls(
+                    lambda: recommender.recommend_courses(
+                        [next_skill() for _ in range(20)], top_n=top_n, strategy=strategy
+                    ),
+                    repeat
+                )))
+    finally:
+        recommender.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark each processing stage")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(TEXT_SIZES), help="Text sizes in words")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(CATALOG_SCALES), help="Catalog sizes")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed calls per case")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="Report of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = []
+    if "text" in args.groups:
+        results += bench_text(args.sizes, args.repeat)
+    if "catalog" in args.groups:
+        results += bench_catalog(args.scales, args.repeat)
+    if "model" in args.groups:
+        results += bench_model(args.scales, args.repeat)
+
+    report = build_report("stages", results, args.baseline, args.tolerance)
+    write_report(report, args.output)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
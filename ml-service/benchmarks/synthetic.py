@@ -0,0 +1,104 @@
+"""
+Synthetic resumes, job descriptions and course catalogs for benchmarks
+
+Everything is generated from a seed, so runs are reproducible and results
+can be compared against a stored baseline.
+"""
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.skill_extractor import KNOWN_SKILLS
+
+# Text sizes in words, roughly a short profile, a typical resume and a long CV
+TEXT_SIZES = (100, 500, 2000)
+
+_FILLER = (
+    "experience with building and maintaining production systems for customers across several teams "
+    "responsible for designing delivering and operating services with a focus on reliability and quality "
+    "collaborated closely with product managers designers and stakeholders to plan and ship features "
+    "mentored junior engineers reviewed code and improved documentation testing and release processes"
+).split()
+
+_JOB_OPENERS = (
+    "we are looking for an engineer to join our growing team",
+    "you will own services end to end and work with",
+    "requirements include solid experience in",
+    "nice to have familiarity with",
+)
+
+_PROVIDERS = ("IBM", "Google", "Google Cloud", "DeepLearning.AI", "Microsoft", "Meta", "AWS", "Duke University")
+_LEVEL_DURATIONS = (
+    "Beginner · Course · 1 - 4 Weeks",
+    "Intermediate · Specialization · 3 - 6 Months",
+    "Advanced · Course · 1 - 3 Months",
+    "Mixed · Course · Less Than 2 Hours",
+    "3 - 6 Months",
+)
+
+
+def synthetic_text(n_words: int, kind: str = "resume", skill_ratio: float = 0.1, seed: int = 0) -> str:
+    """
+    Resume or job description text of about n_words words
+
+    Args:
+        n_words: Approximate number of words
+        kind: "resume" or "job" (job descriptions get requirement phrases)
+        skill_ratio: Fraction of words drawn from the known skills
+        seed: Random seed
+    """
+    rng = np.random.default_rng(seed)
+    words: List[str] = []
+    while len(words) < n_words:
+        if kind == "job" and rng.random() < 0.05:
+            words.extend(_JOB_OPENERS[rng.integers(len(_JOB_OPENERS))].split())
+        elif rng.random() < skill_ratio:
+            words.extend(KNOWN_SKILLS[rng.integers(len(KNOWN_SKILLS))].split())
+        else:
+            words.append(_FILLER[rng.integers(len(_FILLER))])
+    return " ".join(words[:n_words])
+
+
+def synthetic_texts(count: int, n_words: int, kind: str = "resume", seed: int = 0) -> List[str]:
+    """Distinct synthetic texts, so extraction caches don't hide the work"""
+    return [synthetic_text(n_words, kind, seed=seed * 100003 + i) for i in range(count)]
+
+
+def synthetic_skills(count: int, seed: int = 0) -> List[str]:
+    """Distinct skill names drawn from the known skills"""
+    rng = np.random.default_rng(seed)
+    skills = list(dict.fromkeys(KNOWN_SKILLS))
+    return [skills[i] for i in rng.choice(len(skills), size=min(count, len(skills)), replace=False)]
+
+
+def synthetic_embeddings(n: int, dim: int = 384, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Clustered random embeddings, roughly shaped like real course embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim))
+    return points.astype(np.float32)
+
+
+def synthetic_catalog(n: int, dim: int = 384, seed: int = 0) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Course metadata and embeddings for a catalog of n courses
+
+    Returns:
+        Tuple of (metadata DataFrame with the catalog columns, embeddings)
+    """
+    rng = np.random.default_rng(seed)
+    skills = list(dict.fromkeys(KNOWN_SKILLS))
+    courses_df = pd.DataFrame({
+        'Course Name': [f"Course {i}" for i in range(n)],
+        'Provider': [_PROVIDERS[i] for i in rng.integers(len(_PROVIDERS), size=n)],
+        'Skills Gained': [
+            ", ".join(skills[j] for j in rng.choice(len(skills), size=5, replace=False)) for _ in range(n)
+        ],
+        'Rating Score': np.round(rng.uniform(3.5, 5.0, size=n), 1),
+        'Level & Duration': [_LEVEL_DURATIONS[i] for i in rng.integers(len(_LEVEL_DURATIONS), size=n)],
+        'Course Link': [f"https://example.com/course/{i}" for i in range(n)],
+        'Course Image': [""] * n,
+        'Provider Image': [""] * n,
+    })
+    return courses_df, synthetic_embeddings(n, dim=dim, seed=seed)
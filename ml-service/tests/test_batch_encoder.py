@@ -0,0 +1,55 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.batch_encoder import BatchEncoder
+
+
+class FakeModel:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def encode(self, texts, batch_size, convert_to_numpy):
+        with self._lock:
+            self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_lone_call_does_not_wait_for_more_texts():
+    encoder = BatchEncoder(FakeModel(), max_batch_size=32, max_wait_ms=1000)
+    try:
+        start = time.monotonic()
+        for _ in range(5):
+            assert encoder.encode("python")[0] == 6
+        assert time.monotonic() - start < 0.5
+    finally:
+        encoder.close()
+
+
+def test_concurrent_calls_share_batches():
+    model = FakeModel(delay=0.02)
+    encoder = BatchEncoder(model, max_batch_size=32, max_wait_ms=1000)
+    texts = ["x" * n for n in range(1, 41)]
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(encoder.encode, texts))
+    finally:
+        encoder.close()
+
+    assert [int(row[0]) for row in results] == list(range(1, 41))
+    assert sorted(text for batch in model.batches for text in batch) == sorted(texts)
+    assert len(model.batches) < len(texts)
+
+
+def test_encode_many_keeps_input_order():
+    encoder = BatchEncoder(FakeModel(), max_batch_size=3, max_wait_ms=1000)
+    try:
+        rows = encoder.encode_many(["a", "bb", "ccc", "dddd", "eeeee"])
+    finally:
+        encoder.close()
+    assert rows[:, 0].tolist() == [1, 2, 3, 4, 5]
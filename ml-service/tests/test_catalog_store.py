@@ -0,0 +1,98 @@
+import os
+import stat
+
+import numpy as np
+import pandas as pd
+
+from app import catalog_store
+
+
+def courses(texts):
+    return pd.DataFrame({"Course Name": [f"Course {i}" for i in range(len(texts))], "Skills Gained": texts})
+
+
+def build(store_root, texts, embeddings):
+    version_dir = catalog_store.new_version(store_root)
+    catalog_store.write_catalog_store(courses(texts), version_dir, embeddings=embeddings)
+    catalog_store.publish_version(store_root, version_dir)
+    return version_dir
+
+
+def test_publishing_a_new_version_switches_readers(tmp_path):
+    store_root = str(tmp_path / "catalog")
+    first = build(store_root, ["python", "sql"], np.eye(2, 4, dtype=np.float32))
+    second = build(store_root, ["python", "docker", "sql"], np.eye(3, 4, k=1, dtype=np.float32))
+
+    assert first != second
+    assert catalog_store.current_version(store_root) == second
+    assert catalog_store.published_version(store_root) == second
+
+    metadata, embeddings = catalog_store.read_catalog_store(catalog_store.current_version(store_root))
+    assert metadata["Course Name"].tolist() == ["Course 0", "Course 1", "Course 2"]
+    assert isinstance(embeddings, np.memmap)
+
+    previous = catalog_store.read_previous_embeddings(catalog_store.current_version(store_root))
+    hashes = metadata[catalog_store.HASH_COLUMN].tolist()
+    assert set(previous) == set(hashes)
+    np.testing.assert_array_equal(previous[hashes[1]], np.eye(3, 4, k=1)[1])
+
+
+def test_published_version_is_readable_by_other_users(tmp_path):
+    store_root = str(tmp_path / "catalog")
+    version_dir = catalog_store.new_version(store_root)
+    assert stat.S_IMODE(os.stat(version_dir).st_mode) == 0o700
+
+    catalog_store.write_catalog_store(courses(["python"]), version_dir, embeddings=np.ones((1, 4)))
+    catalog_store.publish_version(store_root, version_dir)
+
+    assert stat.S_IMODE(os.stat(version_dir).st_mode) == catalog_store.VERSION_DIR_MODE
+    for name in os.listdir(version_dir):
+        assert stat.S_IMODE(os.stat(os.path.join(version_dir, name)).st_mode) == catalog_store.VERSION_FILE_MODE
+    pointer = os.path.join(store_root, catalog_store.CURRENT_FILE)
+    assert stat.S_IMODE(os.stat(pointer).st_mode) == catalog_store.VERSION_FILE_MODE
+
+
+def test_old_versions_are_pruned(tmp_path):
+    store_root = str(tmp_path / "catalog")
+    versions = [build(store_root, ["python"], np.full((1, 4), i + 1.0)) for i in range(4)]
+
+    remaining = sorted(entry for entry in os.listdir(store_root) if entry.startswith(catalog_store.VERSION_PREFIX))
+    assert remaining == [os.path.basename(path) for path in versions[-catalog_store.KEEP_VERSIONS:]]
+
+
+def test_unpublished_store_has_no_current_version(tmp_path):
+    store_root = str(tmp_path / "catalog")
+    catalog_store.new_version(store_root)
+
+    assert catalog_store.current_version(store_root) is None
+    assert catalog_store.published_version(store_root) is None
+    assert catalog_store.read_previous_embeddings(None) == {}
+
+
+class CountingModel:
+    """Stand-in encoder recording every text it is asked to encode"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True):
+        self.encoded += texts
+        return np.eye(len(texts), 4, dtype=np.float32)
+
+
+def test_reencode_encodes_csv_courses_once(tmp_path, monkeypatch):
+    from app import build_catalog
+
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    courses(["python", "sql", "docker"]).to_csv(data_path / catalog_store.CSV_FILE, index=False)
+    model = CountingModel()
+    monkeypatch.setattr(build_catalog, "_LazyModel", lambda: model)
+
+    build_catalog.build_catalog(str(data_path), reencode=True, full=True)
+
+    assert sorted(model.encoded) == ["docker", "python", "sql"]
+    metadata, embeddings = catalog_store.read_catalog_store(
+        catalog_store.current_version(catalog_store.store_path(str(data_path)))
+    )
+    assert len(metadata) == 3 and embeddings.shape == (3, 4)
@@ -0,0 +1,160 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.course_catalog import CourseCatalog, CourseFilters, parse_level_duration
+
+PROVIDERS = ["Google", "IBM", "Meta", "DeepLearning.AI"]
+LEVELS = ["Beginner", "Intermediate", "Advanced", "Mixed"]
+DURATIONS = ["1 - 4 Weeks", "1 - 3 Months", "3 - 6 Months"]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    rng = np.random.default_rng(0)
+    n = 400
+    ratings = np.round(rng.uniform(3.0, 5.0, n), 1)
+    ratings[rng.random(n) < 0.1] = np.nan
+    courses = pd.DataFrame({
+        "Course Name": [f"Course {i}" for i in range(n)],
+        "Provider": rng.choice(PROVIDERS, n),
+        "Rating Score": ratings,
+        "Level & Duration": [
+            f"{rng.choice(LEVELS)} · Course · {rng.choice(DURATIONS)}" if rng.random() < 0.9 else "N/A"
+            for _ in range(n)
+        ],
+    })
+    return CourseCatalog(courses, embeddings=rng.normal(size=(n, 16)).astype(np.float32))
+
+
+def expected_rows(catalog, filters):
+    rows = []
+    for idx in range(len(catalog)):
+        level, duration = parse_level_duration(catalog.columns["Level & Duration"][idx])
+        rating = catalog.columns["Rating Score"][idx]
+        if filters.provider is not None and catalog.columns["Provider"][idx].lower() != filters.provider:
+            continue
+        if filters.level is not None and level != filters.level:
+            continue
+        if filters.duration is not None and duration != filters.duration:
+            continue
+        if filters.min_rating is not None and not rating >= filters.min_rating:
+            continue
+        rows.append(idx)
+    return rows
+
+
+def test_parse_level_duration():
+    assert parse_level_duration("Beginner · Course · 1 - 3 Months") == ("beginner", "1 - 3 months")
+    assert parse_level_duration("N/A") == (None, None)
+    assert parse_level_duration(None) == (None, None)
+
+
+def test_create_returns_none_without_filters():
+    assert CourseFilters.create() is None
+    assert CourseFilters.create(provider="  Google ", level="BEGINNER") == CourseFilters(provider="google", level="beginner")
+
+
+@pytest.mark.parametrize("provider, min_rating, level", list(itertools.product(
+    [None, "Google", "deeplearning.ai", "Unknown"],
+    [None, 3.0, 4.5, 5.1],
+    [None, "Beginner", "advanced", "expert"],
+)))
+def test_filter_rows_match_a_full_scan(catalog, provider, min_rating, level):
+    filters = CourseFilters.create(provider=provider, min_rating=min_rating, level=level)
+    rows = catalog.filter_rows(filters)
+    if filters is None:
+        assert rows is None
+        assert catalog.filter_mask(filters) is None
+        return
+
+    expected = expected_rows(catalog, filters)
+    assert rows.tolist() == expected
+    assert np.flatnonzero(catalog.filter_mask(filters)).tolist() == expected
+
+
+def test_filter_rows_with_duration(catalog):
+    filters = CourseFilters.create(provider="IBM", level="Mixed", duration="3 - 6 Months", min_rating=4.0)
+    assert catalog.filter_rows(filters).tolist() == expected_rows(catalog, filters)
+
+
+def test_filtered_search_applies_before_top_k(catalog):
+    filters = CourseFilters.create(provider="Meta", level="Beginner", min_rating=4.0)
+    allowed = set(expected_rows(catalog, filters))
+    query = np.random.default_rng(1).normal(size=16).astype(np.float32)
+
+    indices, scores = catalog.search(query, 5, filters=filters)
+
+    assert len(indices) == min(5, len(allowed))
+    assert set(indices.tolist()) <= allowed
+    embeddings = catalog.index.embeddings
+    best = sorted(allowed, key=lambda idx: -float(embeddings[idx] @ (query / np.linalg.norm(query))))[:5]
+    assert indices.tolist() == best
+
+
+def test_unrated_courses_fail_min_rating():
+    courses = pd.DataFrame({"Rating Score": [4.8, None, "n/a", 4.1]})
+    catalog = CourseCatalog(courses, embeddings=np.eye(4, dtype=np.float32))
+    assert catalog.filter_rows(CourseFilters.create(min_rating=0)).tolist() == [0, 3]
+
+
+@pytest.fixture
+def coverage_catalog():
+    # Skills are the first three unit vectors; each course mixes the skills it teaches
+    vectors = [
+        [1, 0, 0, 0],  # 0: skill a
+        [1, 1, 0, 0],  # 1: skills a and b
+        [0, 0, 1, 0],  # 2: skill c
+        [1, 1, 1, 0],  # 3: skills a, b and c
+        [0, 0, 0, 1],  # 4: none
+    ]
+    courses = pd.DataFrame({
+        "Course Name": [f"Course {i}" for i in range(5)],
+        "Provider": ["Google", "Google", "Meta", "IBM", "Google"],
+        "Rating Score": [4.0, 4.8, 4.9, 4.7, 5.0],
+    })
+    return CourseCatalog(courses, embeddings=np.array(vectors, dtype=np.float32))
+
+
+SKILLS = np.eye(3, 4, dtype=np.float32)
+
+
+def test_coverage_search_picks_the_widest_course_first(coverage_catalog):
+    indices, scores, covered = coverage_catalog.coverage_search(SKILLS, 1)
+    assert indices.tolist() == [3]
+    assert covered == [[0, 1, 2]]
+    assert scores[0] == pytest.approx(1 / np.sqrt(3))
+
+    # The next pick improves one skill the most; that skill moves to it
+    indices, _, covered = coverage_catalog.coverage_search(SKILLS, 2)
+    assert indices[0] == 3
+    assert indices[1] in (0, 2)
+    skill = 0 if indices[1] == 0 else 2
+    assert covered[1] == [skill]
+    assert covered[0] == sorted({0, 1, 2} - {skill})
+
+
+def test_coverage_search_applies_filters(coverage_catalog):
+    indices, _, covered = coverage_catalog.coverage_search(SKILLS, 3, filters=CourseFilters.create(provider="Google"))
+
+    # Course 1 teaches two of the skills; course 0 then improves skill a
+    assert indices.tolist() == [1, 0, 4]
+    assert covered == [[1], [0], []]
+
+    indices, _, _ = coverage_catalog.coverage_search(SKILLS, 3, filters=CourseFilters.create(min_rating=4.75))
+    assert indices.tolist()[0] == 1
+    assert set(indices.tolist()) == {1, 2, 4}
+
+
+def test_coverage_search_fills_up_when_nothing_adds_coverage(coverage_catalog):
+    indices, _, covered = coverage_catalog.coverage_search(SKILLS[:1], 3)
+    assert indices[0] == 0
+    assert len(indices) == 3
+    assert covered[0] == [0]
+
+
+def test_coverage_search_with_no_candidates(coverage_catalog):
+    indices, scores, covered = coverage_catalog.coverage_search(SKILLS, 3, filters=CourseFilters.create(provider="Udemy"))
+    assert len(indices) == 0 and len(scores) == 0 and covered == []
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("sentence_transformers")
+
+from app.course_catalog import CourseCatalog, CourseFilters  # noqa: E402
+from app.course_recommender import CourseRecommender  # noqa: E402
+
+# Skill queries map to the first three unit vectors
+VECTORS = {
+    "python": [1, 0, 0, 0],
+    "sql": [0, 1, 0, 0],
+    "docker": [0, 0, 1, 0],
+}
+
+
+class FakeEncoder:
+    """Stands in for the BatchEncoder, counting the texts it encodes"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def _vector(self, text):
+        total = np.zeros(4, dtype=np.float32)
+        for word in text.split():
+            total += np.array(VECTORS.get(word, [0, 0, 0, 1]), dtype=np.float32)
+        return total
+
+    def encode(self, text):
+        self.encoded.append(text)
+        return self._vector(text)
+
+    def encode_many(self, texts):
+        self.encoded.extend(texts)
+        return np.vstack([self._vector(text) for text in texts])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def recommender(monkeypatch):
+    monkeypatch.setattr(CourseRecommender, "_load_model", lambda self: None)
+    monkeypatch.setattr(CourseRecommender, "_load_courses", lambda self: None)
+    recommender = CourseRecommender(data_path=None)
+    recommender.encoder = FakeEncoder()
+
+    vectors = [
+        [1, 0, 0, 0],  # 0: python
+        [1, 1, 0, 0],  # 1: python and sql
+        [0, 0, 1, 0],  # 2: docker
+        [1, 1, 1, 0],  # 3: python, sql and docker
+        [0, 0, 0, 1],  # 4: unrelated
+    ]
+    courses = pd.DataFrame({
+        "Course Name": [f"Course {i}" for i in range(5)],
+        "Provider": ["Google", "Google", "Meta", "IBM", "Google"],
+        "Rating Score": [4.0, 4.8, 4.9, 4.7, 5.0],
+        "Course Link": [f"https://example.com/{i}" for i in range(5)],
+    })
+    recommender._set_catalog(CourseCatalog(courses, embeddings=np.array(vectors, dtype=np.float32)))
+    return recommender
+
+
+def names(courses):
+    return [course["course_name"] for course in courses]
+
+
+def test_coverage_strategy_picks_the_widest_course_first(recommender):
+    courses = recommender.recommend_courses(["Python", "SQL", "Docker"], top_n=1, strategy="coverage")
+
+    assert names(courses) == ["Course 3"]
+    assert courses[0]["covered_skills"] == ["docker", "python", "sql"]
+    # Every skill is encoded once, in one batch
+    assert sorted(recommender.encoder.encoded) == ["docker", "python", "sql"]
+
+
+def test_coverage_strategy_applies_filters(recommender):
+    filters = CourseFilters.create(provider="Google")
+    courses = recommender.recommend_courses(["python", "sql", "docker"], top_n=2, filters=filters, strategy="coverage")
+
+    assert names(courses) == ["Course 1", "Course 0"]
+    assert courses[0]["covered_skills"] == ["sql"]
+    assert courses[1]["covered_skills"] == ["python"]
+
+
+def test_coverage_results_are_cached(recommender):
+    first = recommender.recommend_courses(["python", "sql"], top_n=2, strategy="coverage")
+    first[0]["covered_skills"].append("changed")
+    second = recommender.recommend_courses(["sql", "python", "SQL"], top_n=2, strategy="coverage")
+
+    assert names(second) == names(first)
+    assert "changed" not in second[0]["covered_skills"]
+    assert recommender.cache_stats()["results"]["hits"] == 1
+
+
+def test_unknown_strategy_is_rejected(recommender):
+    with pytest.raises(ValueError):
+        recommender.recommend_courses(["python"], strategy="greedy")
+
+
+def course(name, similarity, **extra):
+    return {
+        "course_name": name,
+        "course_url": f"https://example.com/{name}",
+        "similarity_score": similarity,
+        "match_percentage": round(similarity * 100, 2),
+        **extra,
+    }
+
+
+def test_course_plan_merges_courses_across_jobs():
+    recommendations = [
+        [course("A", 0.5), course("B", 0.9)],
+        [course("A", 0.7), course("C", 0.95)],
+        [course("A", 0.6), course("B", 0.4)],
+        [],
+    ]
+    plan = CourseRecommender._course_plan(recommendations, 10)
+
+    assert names(plan) == ["A", "B", "C"]
+    assert [entry["jobs"] for entry in plan] == [[0, 1, 2], [0, 2], [1]]
+    assert [entry["job_count"] for entry in plan] == [3, 2, 1]
+    # The best similarity across jobs is kept
+    assert plan[0]["similarity_score"] == 0.7
+    assert plan[0]["match_percentage"] == 70.0
+    assert names(CourseRecommender._course_plan(recommendations, 2)) == ["A", "B"]
+
+
+def test_course_plan_dedups_by_name_and_url_and_merges_covered_skills():
+    recommendations = [
+        [course("A", 0.5, covered_skills=["sql"]), course("A", 0.6, course_url="https://other.com/A")],
+        [course("A", 0.4, covered_skills=["python", "sql"])],
+    ]
+    plan = CourseRecommender._course_plan(recommendations, 10)
+
+    assert len(plan) == 2
+    merged = next(entry for entry in plan if entry["course_url"] == "https://example.com/A")
+    assert merged["jobs"] == [0, 1]
+    assert merged["covered_skills"] == ["python", "sql"]
+    # The input courses are not modified
+    assert recommendations[0][0]["covered_skills"] == ["sql"]
+
+
+def test_search_many_cached_dedups_queries_and_reuses_results(recommender):
+    texts = ["python sql", "Python  SQL", "docker", "", "python sql"]
+    results = recommender._search_many_cached("recommend", texts, 2, detailed=True)
+
+    assert len(results) == len(texts)
+    assert names(results[0]) == ["Course 1", "Course 3"]
+    assert results[1] == results[0] == results[4]
+    assert names(results[2])[0] == "Course 2"
+    assert results[3] == []
+    # Identical queries are encoded once
+    assert sorted(recommender.encoder.encoded) == ["docker", "python sql"]
+
+    results[0][0]["course_name"] = "changed"
+    again = recommender._search_many_cached("recommend", ["docker", "python sql"], 2, detailed=True)
+    assert names(again[1]) == ["Course 1", "Course 3"]
+    assert sorted(recommender.encoder.encoded) == ["docker", "python sql"]
+    assert recommender.cache_stats()["results"]["hits"] == 2
+
+    # Results are shared with the single-query search cache
+    assert names(recommender._search_cached("recommend", "python sql", 2, detailed=True)) == ["Course 1", "Course 3"]
+    assert recommender.cache_stats()["results"]["hits"] == 3
+
+
+def test_search_many_cached_keys_on_filters(recommender):
+    filters = CourseFilters.create(provider="Google")
+    unfiltered = recommender._search_many_cached("recommend", ["docker"], 1, detailed=True)
+    filtered = recommender._search_many_cached("recommend", ["docker"], 1, detailed=True, filters=filters)
+
+    assert names(unfiltered[0]) == ["Course 2"]
+    assert names(filtered[0]) != ["Course 2"]
+    assert recommender.cache_stats()["results"]["hits"] == 0
@@ -0,0 +1,74 @@
+import sqlite3
+import time
+
+from app.extraction_cache import ExtractionCache
+
+
+def namespace(extraction_version: int) -> str:
+    """Namespace in the form SkillExtractor builds it: taxonomy:profile:EXTRACTION_VERSION"""
+    return f"taxonomy-v1:default:{extraction_version}"
+
+
+def test_memory_tier_serves_repeated_lookups():
+    cache = ExtractionCache(10, namespace(2))
+    assert cache.get("Python and SQL") is None
+    cache.set("Python and SQL", ["python", "sql"])
+    # Keys use the normalized text
+    assert cache.get("  python   AND sql ") == ["python", "sql"]
+    assert "disk" not in cache.stats()
+
+
+def test_disk_entries_are_promoted_to_memory(tmp_path):
+    db_path = str(tmp_path / "extraction.db")
+    ExtractionCache(10, namespace(2), db_path=db_path).set("Python and SQL", ["python", "sql"])
+
+    # A fresh process starts with an empty LRU and finds the entry on disk
+    cache = ExtractionCache(10, namespace(2), db_path=db_path)
+    assert len(cache.memory) == 0
+    assert cache.get("Python and SQL") == ["python", "sql"]
+    assert cache.stats()["disk"]["hits"] == 1
+    assert len(cache.memory) == 1
+
+    # The second lookup is served from memory without touching SQLite
+    assert cache.get("Python and SQL") == ["python", "sql"]
+    assert cache.stats()["disk"]["hits"] == 1
+    assert cache.memory.stats()["hits"] == 1
+
+    assert cache.get("Docker") is None
+    assert cache.stats()["disk"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+def test_new_extraction_version_invalidates_entries(tmp_path):
+    db_path = str(tmp_path / "extraction.db")
+    old = ExtractionCache(10, namespace(2), db_path=db_path)
+    old.set("Python and SQL", ["python", "sql"])
+
+    new = ExtractionCache(10, namespace(3), db_path=db_path)
+    assert new.key("Python and SQL") != old.key("Python and SQL")
+    assert new.get("Python and SQL") is None
+    new.set("Python and SQL", ["python", "sql", "databases"])
+
+    # Both versions share the file, e.g. during a rolling deploy, without mixing results
+    assert ExtractionCache(10, namespace(2), db_path=db_path).get("Python and SQL") == ["python", "sql"]
+    assert ExtractionCache(10, namespace(3), db_path=db_path).get("Python and SQL") == ["python", "sql", "databases"]
+
+
+def test_old_entries_are_pruned_on_open(tmp_path):
+    db_path = str(tmp_path / "extraction.db")
+    cache = ExtractionCache(0, namespace(2), db_path=db_path)
+    cache.set("Python", ["python"])
+    cache.set("Docker", ["docker"])
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "UPDATE extraction_cache SET created_at = ? WHERE key = ?",
+            (time.time() - 7200, cache.key("Python"))
+        )
+
+    # Without a max age nothing is pruned
+    assert ExtractionCache(0, namespace(2), db_path=db_path).get("Python") == ["python"]
+
+    cache = ExtractionCache(0, namespace(2), db_path=db_path, max_age_seconds=3600)
+    assert cache.get("Python") is None
+    assert cache.get("Docker") == ["docker"]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0] == 1
@@ -0,0 +1,136 @@
+import time
+
+import numpy as np
+import pytest
+from rapidfuzz import fuzz, process
+
+from app import skill_taxonomy
+from app.skill_taxonomy import SkillTaxonomy, load_taxonomy
+
+
+def tokenize(text):
+    return text.split()
+
+
+def random_words(rng, count, low, high, alphabet="abcdefghijklmnopqrstuvwxyz"):
+    letters = np.array(list(alphabet))
+    return ["".join(rng.choice(letters, rng.integers(low, high))) for _ in range(count)]
+
+
+def typo(rng, word):
+    i = int(rng.integers(len(word)))
+    return word[:i] + ("x" if word[i] != "x" else "y") + word[i + 1:]
+
+
+def full_scan(taxonomy, tokens, threshold):
+    scores = process.cdist(taxonomy._fuzzy_strings, tokens, scorer=fuzz.partial_ratio, score_cutoff=threshold, workers=-1)
+    positions = np.flatnonzero((scores > threshold).any(axis=1))
+    return {taxonomy.names[taxonomy.term_skill[taxonomy.fuzzy_terms[p]]] for p in positions}
+
+
+def phrase_taxonomy(size, seed=0):
+    """Taxonomy of size phrases made of one to three words from a shared vocabulary"""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(random_words(rng, max(100, size // 6), 4, 11))
+    phrases = dict.fromkeys(" ".join(rng.choice(vocabulary, rng.integers(1, 4))) for _ in range(size * 2))
+    return SkillTaxonomy.from_skills(list(phrases)[:size]), vocabulary.tolist()
+
+
+@pytest.fixture(scope="module")
+def large_taxonomy():
+    taxonomy, vocabulary = phrase_taxonomy(50000)
+    assert taxonomy._term_lengths is not None
+    return taxonomy, vocabulary
+
+
+def test_match_finds_multi_token_phrases_and_aliases():
+    taxonomy = SkillTaxonomy([
+        ("ml", "Machine Learning", ["ML"]),
+        ("ml-ops", "Machine Learning Operations", ["mlops"]),
+        ("py", "Python", []),
+    ])
+    taxonomy.compile(tokenize)
+
+    tokens = "built machine learning operations pipelines in python and ml".split()
+    assert taxonomy.match(tokens) == ["machine learning", "machine learning operations", "python", "machine learning"]
+    assert taxonomy.match("machine".split()) == []
+
+
+def test_match_requires_compile():
+    with pytest.raises(RuntimeError):
+        SkillTaxonomy.from_skills(["python"]).match(["python"])
+
+
+def test_shared_phrase_keeps_its_first_owner():
+    taxonomy = SkillTaxonomy([("js", "JavaScript", ["js"]), ("json", "JSON", ["JS"])])
+    taxonomy.compile(tokenize)
+    assert taxonomy.match(["js", "json"]) == ["javascript", "json"]
+
+
+def test_fuzzy_match_small_taxonomy():
+    taxonomy = SkillTaxonomy.from_skills(["kubernetes", "tensorflow", "sql"])
+    assert taxonomy._term_lengths is None
+    assert taxonomy.fuzzy_match(["kubernets", "tensorflw", "java"], 85) == ["kubernetes", "tensorflow"]
+    assert taxonomy.fuzzy_match([], 85) == []
+
+
+def test_capped_fuzzy_match_finds_misspellings(large_taxonomy):
+    taxonomy, vocabulary = large_taxonomy
+    rng = np.random.default_rng(1)
+    terms = set(taxonomy.terms)
+    words = [word for word in vocabulary if word in terms and len(word) >= 7][:100]
+    assert len(words) > 20
+    found = set(taxonomy.fuzzy_match([typo(rng, word) for word in words], 85))
+
+    # Every single-word skill within one typo of a token is found
+    assert set(words) <= found
+
+
+def test_capped_fuzzy_match_reports_no_false_matches(large_taxonomy):
+    taxonomy, vocabulary = large_taxonomy
+    rng = np.random.default_rng(2)
+    tokens = [typo(rng, word) for word in rng.choice(vocabulary, 50)] + random_words(rng, 50, 3, 10)
+    found = set(taxonomy.fuzzy_match(tokens, 85))
+    expected = full_scan(taxonomy, tokens, 85)
+    # Scores are exact, so nothing outside a full scan is reported
+    assert found <= expected
+    assert len(found) >= 0.8 * len(expected)
+
+
+def test_fuzzy_candidates_are_capped(large_taxonomy):
+    taxonomy, vocabulary = large_taxonomy
+    for token in ["ing", "data", *vocabulary[:50]]:
+        assert len(taxonomy._fuzzy_candidates(token)) <= skill_taxonomy.FUZZY_MAX_CANDIDATES
+
+
+def test_fuzzy_match_time_does_not_grow_with_taxonomy_size(large_taxonomy):
+    small, small_vocabulary = phrase_taxonomy(6000)
+    large, vocabulary = large_taxonomy
+    rng = np.random.default_rng(3)
+
+    def best_time(taxonomy, words):
+        tokens = [typo(rng, word) for word in rng.choice(words, 300)]
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            taxonomy.fuzzy_match(tokens, 85)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    large_time = best_time(large, vocabulary)
+    # A full scan of 300 tokens against 50k phrases takes seconds
+    assert large_time < 0.5
+    assert large_time < 4 * best_time(small, small_vocabulary) + 0.05
+
+
+def test_compiled_taxonomy_round_trip(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text('[{"id": "ml", "name": "Machine Learning", "aliases": ["ML"]}]', encoding="utf-8")
+
+    taxonomy = load_taxonomy(str(path), tokenize)
+    loaded = SkillTaxonomy.load(skill_taxonomy.compiled_path(str(path)))
+
+    assert loaded is not None
+    assert loaded.version == taxonomy.version
+    assert loaded.match(["ml"]) == ["machine learning"]
+    assert load_taxonomy(str(path), tokenize).version == taxonomy.version
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from app.vector_index import IVFIndex, PRECISIONS, QuantizedIndex, VectorIndex, _cluster_sums, is_memory_mapped
+
+
+def clustered_embeddings(n: int, dim: int = 64, clusters: int = 20, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    return clustered_embeddings(3000)
+
+
+@pytest.fixture(scope="module")
+def queries():
+    return clustered_embeddings(25, seed=1)
+
+
+def test_quantize_error_is_within_half_a_step(embeddings):
+    normalized = VectorIndex(embeddings).embeddings
+    compact, scales = QuantizedIndex.quantize(normalized, "int8", chunk_size=700)
+
+    assert compact.dtype == np.int8
+    assert scales.shape == (normalized.shape[1],)
+    assert np.abs(compact).max() <= 127
+    error = np.abs(compact.astype(np.float32) * scales - normalized)
+    assert np.all(error <= scales / 2 + 1e-6)
+
+
+def test_quantize_rejects_unknown_precision(embeddings):
+    with pytest.raises(ValueError):
+        QuantizedIndex.quantize(embeddings, "float16")
+    with pytest.raises(ValueError):
+        QuantizedIndex(embeddings, precision="float16")
+    assert PRECISIONS == ("int8",)
+
+
+def test_search_matches_exact_search(embeddings, queries):
+    exact = VectorIndex(embeddings)
+    index = QuantizedIndex(embeddings, rerank_factor=4, chunk_size=128)
+    for query in queries:
+        expected, expected_scores = exact.search(query, 10)
+        found, scores = index.search(query, 10)
+        assert found.tolist() == expected.tolist()
+        # Re-ranked scores are exact float32 similarities, not approximations
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_search_respects_mask(embeddings, queries):
+    exact = VectorIndex(embeddings)
+    index = QuantizedIndex(embeddings)
+    rng = np.random.default_rng(2)
+    # Selective and broad masks take different scoring paths
+    for fraction in (0.1, 0.9):
+        mask = rng.random(len(embeddings)) < fraction
+        for query in queries[:5]:
+            found, _ = index.search(query, 10, mask=mask)
+            assert mask[found].all()
+            assert found.tolist() == exact.search(query, 10, mask=mask)[0].tolist()
+
+
+def test_rerank_orders_shortlist_by_exact_score(embeddings, queries):
+    index = QuantizedIndex(embeddings)
+    query = VectorIndex.normalize_query(queries[0])
+    shortlist = np.array([5, 900, 17, 2500, 42])
+    found, scores = index._rerank(query, shortlist, 3)
+
+    exact_scores = index.embeddings[shortlist] @ query
+    expected = shortlist[np.argsort(-exact_scores, kind="stable")[:3]]
+    assert found.tolist() == expected.tolist()
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_search_many_matches_search(embeddings, queries):
+    index = QuantizedIndex(embeddings, chunk_size=256)
+    mask = np.random.default_rng(3).random(len(embeddings)) < 0.3
+    for batch_mask in (None, mask):
+        batch = index.search_many(queries, 7, mask=batch_mask)
+        for query, (found, scores) in zip(queries, batch):
+            single, single_scores = index.search(query, 7, mask=batch_mask)
+            assert found.tolist() == single.tolist()
+            np.testing.assert_allclose(scores, single_scores, rtol=1e-6)
+
+
+def test_empty_results(embeddings, queries):
+    index = QuantizedIndex(embeddings)
+    assert len(index.search(queries[0], 0)[0]) == 0
+    assert [len(found) for found, _ in index.search_many(queries[:2], 0)] == [0, 0]
+
+
+def test_save_and_load_compact(tmp_path, embeddings, queries):
+    index = QuantizedIndex(embeddings)
+    index.save(str(tmp_path))
+
+    compact, scales = QuantizedIndex.load_compact(str(tmp_path), "int8", len(embeddings))
+    assert is_memory_mapped(compact)
+    np.testing.assert_array_equal(compact, index.compact)
+    np.testing.assert_array_equal(scales, index.scales)
+    # Files built for a catalog of another size are ignored
+    assert QuantizedIndex.load_compact(str(tmp_path), "int8", len(embeddings) + 1) is None
+
+    loaded = QuantizedIndex(embeddings, compact=compact, scales=scales)
+    assert loaded.search(queries[0], 10)[0].tolist() == index.search(queries[0], 10)[0].tolist()
+
+
+def test_memory_bytes_counts_in_memory_float32_matrix(tmp_path, embeddings):
+    in_memory = QuantizedIndex(embeddings)
+    compact_bytes = in_memory.compact.nbytes + in_memory.scales.nbytes
+    assert in_memory.memory_bytes() == compact_bytes + in_memory.embeddings.nbytes
+
+    path = tmp_path / "embeddings.npy"
+    np.save(path, VectorIndex(embeddings).embeddings)
+    mapped = QuantizedIndex(np.load(path, mmap_mode="r"), normalized=True)
+    assert is_memory_mapped(mapped.embeddings)
+    assert mapped.memory_bytes() == compact_bytes
+
+
+def test_cluster_sums_match_scatter_add():
+    rng = np.random.default_rng(4)
+    points = rng.normal(size=(500, 8)).astype(np.float32)
+    # Cluster 3 and the last clusters stay empty
+    labels = rng.choice([0, 1, 2, 4, 5], 500)
+    expected = np.zeros((8, 8), dtype=np.float32)
+    np.add.at(expected, labels, points)
+    np.testing.assert_allclose(_cluster_sums(points, labels, 8), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_ivf_probing_every_list_is_exact(embeddings, queries):
+    exact = VectorIndex(embeddings)
+    index = IVFIndex(embeddings, n_lists=16, n_probe=16)
+    mask = np.random.default_rng(5).random(len(embeddings)) < 0.5
+    for query in queries[:5]:
+        for query_mask in (None, mask):
+            found, scores = index.search(query, 10, mask=query_mask)
+            expected, expected_scores = exact.search(query, 10, mask=query_mask)
+            assert found.tolist() == expected.tolist()
+            np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_ivf_recall_with_few_probes(embeddings, queries):
+    exact = VectorIndex(embeddings)
+    index = IVFIndex(embeddings, n_probe=32, seed=1)
+    recall = np.mean([
+        len(set(index.search(query, 10)[0].tolist()) & set(exact.search(query, 10)[0].tolist())) / 10
+        for query in queries
+    ])
+    assert recall >= 0.9
+
+
+def test_ivf_shares_a_memory_mapped_matrix(tmp_path, embeddings, queries):
+    path = tmp_path / "embeddings.npy"
+    np.save(path, VectorIndex(embeddings).embeddings)
+    index = IVFIndex(np.load(path, mmap_mode="r"), normalized=True, n_lists=16)
+
+    assert is_memory_mapped(index.embeddings)
+    # Only the cluster structure is held in memory, no copy of the embeddings
+    assert index.memory_bytes() < index.embeddings.nbytes // 10
+
+    index.save(str(tmp_path))
+    centroids, assignments = IVFIndex.load_clusters(str(tmp_path), len(index))
+    loaded = IVFIndex(np.load(path, mmap_mode="r"), normalized=True, centroids=centroids, assignments=assignments)
+    assert loaded.search(queries[0], 10)[0].tolist() == index.search(queries[0], 10)[0].tolist()
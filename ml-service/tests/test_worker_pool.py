@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.worker_pool import PoolSaturatedError, WorkerPool
+
+
+async def settle(pool: WorkerPool, pending: int = 0, timeout: float = 5.0):
+    """Wait for done-callbacks to bring the pool back to a pending count"""
+    deadline = time.monotonic() + timeout
+    while pool.stats()["pending"] != pending and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    return pool.stats()["pending"]
+
+
+def test_full_pool_rejects_new_tasks():
+    async def scenario():
+        pool = WorkerPool.threads("inference", max_workers=2, max_queue_depth=3)
+        release = threading.Event()
+        try:
+            # Two running tasks and one queued fill the pool
+            tasks = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            assert pool.stats()["pending"] == 3
+
+            with pytest.raises(PoolSaturatedError):
+                pool.submit(time.sleep, 0)
+            with pytest.raises(PoolSaturatedError):
+                await pool.run(time.sleep, 0)
+
+            release.set()
+            assert await asyncio.gather(*tasks) == [True, True, True]
+            assert await settle(pool) == 0
+            assert await pool.run(sum, [1, 2]) == 3
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_task_keeps_its_slot_until_it_finishes():
+    async def scenario():
+        pool = WorkerPool.threads("inference", max_workers=1, max_queue_depth=1)
+        release = threading.Event()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(pool.run(release.wait, 5), timeout=0.05)
+            # The thread is still running the task, so the pool stays full
+            with pytest.raises(PoolSaturatedError):
+                pool.submit(time.sleep, 0)
+
+            release.set()
+            assert await settle(pool) == 0
+            assert await pool.run(sum, [2, 2]) == 4
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_saturated_pool_is_rejected_with_503():
+    pytest.importorskip("spacy")
+    pytest.importorskip("sentence_transformers")
+    from fastapi import HTTPException
+    from app import main
+
+    async def scenario():
+        pool = WorkerPool.threads("inference", max_workers=1, max_queue_depth=1)
+        release = threading.Event()
+        try:
+            task = asyncio.ensure_future(pool.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            with pytest.raises(HTTPException) as error:
+                await main.run_in_pool(pool, time.sleep, 0)
+            assert error.value.status_code == 503
+            assert error.value.headers == {"Retry-After": "1"}
+            with pytest.raises(HTTPException) as error:
+                main.submit_to_pool(pool, time.sleep, 0)
+            assert error.value.status_code == 503
+            release.set()
+            await task
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_recycling_replaces_a_stuck_process_pool():
+    async def scenario():
+        pool = WorkerPool.processes("pdf", max_workers=1, max_queue_depth=4)
+        try:
+            # Start the worker process before timing anything
+            assert await pool.run(abs, -1) == 1
+            old_executor = pool.executor
+
+            stuck = pool.submit(time.sleep, 60)
+            waiter = asyncio.wrap_future(stuck)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(waiter), timeout=0.5)
+            assert stuck.running()
+            queued = pool.submit(abs, -2)
+
+            pool.recycle()
+
+            assert pool.executor is not old_executor
+            assert pool.stats()["recycled"] == 1
+            # Tasks of the old executor fail instead of occupying slots
+            with pytest.raises(BrokenProcessPool):
+                await asyncio.wait_for(waiter, timeout=10)
+            with pytest.raises((BrokenProcessPool, asyncio.CancelledError)):
+                await asyncio.wait_for(asyncio.wrap_future(queued), timeout=10)
+            assert await settle(pool) == 0
+
+            # The fresh executor takes new work right away
+            start = time.monotonic()
+            assert await asyncio.wait_for(pool.run(abs, -3), timeout=30) == 3
+            assert time.monotonic() - start < 30
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_thread_pool_cannot_be_recycled():
+    pool = WorkerPool.threads("inference", max_workers=1, max_queue_depth=1)
+    try:
+        with pytest.raises(RuntimeError):
+            pool.recycle()
+    finally:
+        pool.shutdown()